@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from .database import SessionLocal
+from .models import Category
+
+# Seconds before the cached categories are re-read, which picks up writes
+# made by other processes such as init_db; 0 disables the refresh
+CATEGORY_CACHE_TTL = float(os.getenv("CATEGORY_CACHE_TTL", "300"))
+
+_CHANGED_KEY = "categories_changed"
+
+@dataclass(frozen=True, slots=True)
+class CategoryInfo:
+    """A detached, read-only copy of a categories row"""
+    id: str
+    name: str
+    description: Optional[str]
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "name": self.name, "description": self.description}
+
+def _mark_session(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[_CHANGED_KEY] = True
+
+def _check_bulk_write(orm_execute_state):
+    # Bulk query.update()/delete() and insert() statements skip the mapper events
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ is Category for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info[_CHANGED_KEY] = True
+
+def _after_commit(session):
+    if session.info.pop(_CHANGED_KEY, False):
+        for cache in list(_caches):
+            cache.invalidate()
+
+def _after_rollback(session):
+    session.info.pop(_CHANGED_KEY, None)
+
+# Every live CategoryCache; the listeners below are registered once and notify all of them
+_caches: "weakref.WeakSet[CategoryCache]" = weakref.WeakSet()
+for _name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Category, _name, _mark_session)
+event.listen(Session, "do_orm_execute", _check_bulk_write)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
+
+class CategoryCache:
+    """The categories table, held in memory.
+
+    Loaded once at startup and reloaded by the thread that commits a change
+    to a Category in this process. After CATEGORY_CACHE_TTL seconds the next
+    read starts a reload in a background thread and keeps serving the
+    cached rows meanwhile, so reads never wait on the database. The version
+    is a digest of the cached rows, so it only changes when the categories do.
+    """
+
+    def __init__(self, session_factory=SessionLocal, ttl: float = CATEGORY_CACHE_TTL):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self._snapshot: Optional[Tuple[Dict[str, CategoryInfo], str, float]] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        _caches.add(self)
+
+    def load(self):
+        """Read every category from the database and swap in the new snapshot"""
+        db = self.session_factory()
+        try:
+            rows = db.query(Category).all()
+            categories = {
+                row.id: CategoryInfo(id=row.id, name=row.name, description=row.description)
+                for row in rows
+            }
+        finally:
+            db.close()
+        payload = json.dumps([category.to_dict() for category in categories.values()])
+        version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+        self._snapshot = (categories, version, time.monotonic())
+        print(f"Loaded {len(categories)} categories into cache")
+
+    def invalidate(self):
+        """Reload the cached categories after a committed change.
+
+        Runs in the committing thread, which is already doing database work;
+        if the reload fails, the cached rows are marked expired instead.
+        """
+        try:
+            with self._lock:
+                self.load()
+        except Exception as e:
+            print(f"Error reloading categories: {e}")
+            snapshot = self._snapshot
+            if snapshot is not None:
+                self._snapshot = (snapshot[0], snapshot[1], float("-inf"))
+
+    def _refresh(self):
+        try:
+            with self._lock:
+                self.load()
+        except Exception as e:
+            print(f"Error refreshing categories: {e}")
+            # Keep serving the cached rows and try again after another TTL
+            snapshot = self._snapshot
+            self._snapshot = (snapshot[0], snapshot[1], time.monotonic())
+        finally:
+            self._refreshing = False
+
+    def _current(self) -> Tuple[Dict[str, CategoryInfo], str, float]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Only before the startup load
+            with self._lock:
+                if self._snapshot is None:
+                    self.load()
+                return self._snapshot
+        if self.ttl > 0 and time.monotonic() - snapshot[2] > self.ttl:
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh, name="category-cache-refresh", daemon=True).start()
+        return snapshot
+
+    @property
+    def version(self) -> str:
+        return self._current()[1]
+
+    def get(self, category_id: str) -> Optional[CategoryInfo]:
+        """Get a category by its ID"""
+        return self._current()[0].get(category_id)
+
+    def all(self) -> List[CategoryInfo]:
+        """Get all categories"""
+        return list(self._current()[0].values())
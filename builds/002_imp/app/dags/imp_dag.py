@@ -8,9 +8,7 @@
 # Add the app directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from app.database import update_database
-from app.init_chroma import update_chroma_db
-from app.topic_utils import process_topics
+from app.dags.imp_tasks import TASKS
 
 default_args = {
     'owner': 'airflow',
@@ -31,24 +29,21 @@
     tags=['imp'],
 )
 
-# Define tasks
-update_db_task = PythonOperator(
-    task_id='update_database',
-    python_callable=update_database,
-    dag=dag,
-)
-
-update_chroma_task = PythonOperator(
-    task_id='update_chroma_db',
-    python_callable=update_chroma_db,
-    dag=dag,
-)
-
-process_topics_task = PythonOperator(
-    task_id='process_topics',
-    python_callable=process_topics,
-    dag=dag,
-)
+# Define tasks from the shared task graph, which app/dags/local_runner.py
+# also runs without Airflow
+operators = {
+    task.task_id: PythonOperator(
+        task_id=task.task_id,
+        python_callable=task.python_callable,
+        dag=dag,
+    )
+    for task in TASKS
+}
 
-# Define task dependencies
-update_db_task >> [update_chroma_task, process_topics_task] 
\ No newline at end of file
+# Define task dependencies. Each stage keeps a content-hash watermark under
+# data/pipeline and only processes what changed since its last run;
+# update_database publishes the knowledge and topic snapshots the other two
+# stages read, so they can run in parallel.
+for task in TASKS:
+    for upstream_id in task.upstream:
+        operators[upstream_id] >> operators[task.task_id]
@@ -0,0 +1,40 @@
+"""Task graph of the imp pipeline, shared by the Airflow DAG and the local runner"""
+from dataclasses import dataclass
+from typing import Any, Callable, Tuple
+import sys
+import os
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.database import update_database
+from app.init_chroma import update_chroma_db
+from app.topic_utils import process_topics
+
+@dataclass(frozen=True)
+class PipelineTask:
+    task_id: str
+    python_callable: Callable[[], Any]
+    upstream: Tuple[str, ...] = ()
+    # Number of rows (items, documents, topics) the task processed, from its return value
+    count_rows: Callable[[Any], int] = lambda result: 0
+
+TASKS = (
+    PipelineTask(
+        task_id='update_database',
+        python_callable=update_database,
+        count_rows=lambda result: result["knowledge_changed"] + result["knowledge_removed"],
+    ),
+    PipelineTask(
+        task_id='update_chroma_db',
+        python_callable=update_chroma_db,
+        upstream=('update_database',),
+        count_rows=lambda result: result,
+    ),
+    PipelineTask(
+        task_id='process_topics',
+        python_callable=process_topics,
+        upstream=('update_database',),
+        count_rows=lambda result: result["changed"] + result["removed"],
+    ),
+)
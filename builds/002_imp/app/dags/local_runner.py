@@ -0,0 +1,120 @@
+"""Run the imp pipeline task graph without an Airflow deployment.
+
+Tasks run on a thread or process pool as soon as everything upstream of
+them has succeeded, so update_chroma_db and process_topics run in
+parallel after update_database. Each task's wall time, peak memory and
+rows processed are recorded; tasks downstream of a failure are skipped.
+
+In process mode every task runs in a fresh worker process, so peak memory
+is that task's own peak RSS. In thread mode tasks share the runner's
+process and the figure is the process-wide peak RSS when the task ended.
+
+Run from the project root:
+    python -m app.dags.local_runner [--executor process|thread] [--workers 2] [--full] [--json report.json]
+"""
+import argparse
+import json
+import resource
+import sys
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app import pipeline
+from app.dags.imp_tasks import TASKS
+
+def _run_task(task_id: str):
+    """Run one task by id, returning its result, wall time and peak RSS in KiB"""
+    task = next(task for task in TASKS if task.task_id == task_id)
+    start = time.perf_counter()
+    result = task.python_callable()
+    elapsed = time.perf_counter() - start
+    return result, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def clear_watermarks():
+    """Forget every stage's watermark so the next run is a full refresh"""
+    for task in TASKS:
+        path = pipeline.artifact_path(f"{task.task_id}.watermark.json")
+        if path.exists():
+            path.unlink()
+
+def run_pipeline(executor: str = "process", workers: int = 2) -> List[Dict]:
+    """Run every task in dependency order and return one report entry per task"""
+    if executor == "process":
+        # One process per task, so each task's peak RSS is its own
+        pool = ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1)
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    reports: Dict[str, Dict] = {task.task_id: {"task_id": task.task_id, "status": "pending"} for task in TASKS}
+    running = {}
+    start = time.perf_counter()
+    with pool:
+        while True:
+            for task in TASKS:
+                report = reports[task.task_id]
+                if report["status"] != "pending":
+                    continue
+                upstream = [reports[task_id]["status"] for task_id in task.upstream]
+                if any(status in ("failed", "skipped") for status in upstream):
+                    report["status"] = "skipped"
+                elif all(status == "success" for status in upstream):
+                    report["status"] = "running"
+                    report["started_at"] = round(time.perf_counter() - start, 3)
+                    running[pool.submit(_run_task, task.task_id)] = task
+                    print(f"Started {task.task_id}")
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                report = reports[task.task_id]
+                try:
+                    result, elapsed, peak_rss_kib = future.result()
+                except Exception as e:
+                    report.update(status="failed", error=str(e))
+                    print(f"Task {task.task_id} failed: {e}")
+                    continue
+                report.update(
+                    status="success",
+                    wall_time=round(elapsed, 3),
+                    peak_memory_mib=round(peak_rss_kib / 1024, 1),
+                    rows_processed=task.count_rows(result),
+                )
+                print(f"Finished {task.task_id} in {elapsed:.2f}s")
+    return list(reports.values())
+
+def print_report(reports: List[Dict], total: float):
+    print(f"\n{'task':<18} {'status':<8} {'start s':>8} {'wall s':>8} {'peak MiB':>9} {'rows':>8}")
+    for report in reports:
+        print(f"{report['task_id']:<18} {report['status']:<8} {report.get('started_at', '-'):>8} "
+              f"{report.get('wall_time', '-'):>8} {report.get('peak_memory_mib', '-'):>9} "
+              f"{report.get('rows_processed', '-'):>8}")
+    print(f"Pipeline finished in {total:.2f}s")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the imp pipeline locally")
+    parser.add_argument("--executor", choices=("process", "thread"), default="process")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--full", action="store_true", help="ignore watermarks and reprocess everything")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.full:
+        clear_watermarks()
+    start = time.perf_counter()
+    reports = run_pipeline(args.executor, args.workers)
+    total = time.perf_counter() - start
+    print_report(reports, total)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"executor": args.executor, "total_wall_time": round(total, 3), "tasks": reports}, f, indent=2)
+    return 0 if all(report["status"] == "success" for report in reports) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 import os
 
@@ -7,12 +8,60 @@
 os.makedirs("data", exist_ok=True)
 
 # Create SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///data/curiousbot.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///data/curiousbot.db")
+
+# SQLite storage profiles. "default" keeps SQLite's own settings (rollback
+# journal, full fsync on every commit). "tuned" uses a WAL journal so readers
+# don't block the writer, syncs only at checkpoints, memory-maps reads and
+# waits on a locked database instead of failing with "database is locked".
+STORAGE_PROFILES = {
+    "default": {
+        "pragmas": {},
+        "pool_size": 5,
+        "max_overflow": 10,
+        "timeout": 5,
+    },
+    "tuned": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 268435456,  # 256 MiB
+            "busy_timeout": 30000,  # milliseconds
+            "cache_size": -65536,  # 64 MiB
+            "temp_store": "MEMORY",
+        },
+        "pool_size": 20,
+        "max_overflow": 20,
+        "timeout": 30,
+    },
+}
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, profile: str = DB_PROFILE):
+    """Create an engine configured with one of the STORAGE_PROFILES"""
+    settings = STORAGE_PROFILES[profile]
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": settings["timeout"]},
+        # SQLAlchemy 1.4 defaults file SQLite to NullPool, which rejects the pool sizes
+        poolclass=QueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+    )
+
+    pragmas = settings["pragmas"]
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return engine
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -26,4 +75,57 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def update_database() -> dict:
+    """Pipeline stage: seed changed knowledge items and publish the snapshots
+    read by the update_chroma_db and process_topics stages.
+
+    Knowledge items are compared with the rows already in knowledge_items,
+    matched on the doc_id ChromaDB also uses: only new or changed items are
+    written and items no longer in the knowledge base are deleted, so a
+    recreated database is fully re-seeded. The topics file is only parsed
+    and deduplicated again when its digest differs from this stage's
+    watermark.
+    """
+    # Imported here because the models and seeding modules import this one
+    from . import pipeline
+    from .data_definitions import CATEGORIES
+    from .init_db import delete_knowledge_items, seed_categories, seed_knowledge_items
+    from .migrations import migrate
+    from .models import KnowledgeItem
+    from .topic_utils import TOPICS_PATH, file_digest, topic_snapshot
+
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+
+    watermark = pipeline.read_watermark("update_database")
+    knowledge = pipeline.knowledge_snapshot()
+
+    db = SessionLocal()
+    try:
+        seed_categories(db, CATEGORIES)
+        knowledge_base = {}
+        for item in knowledge.values():
+            knowledge_base.setdefault(item["category_id"], []).append(item)
+        changed = seed_knowledge_items(db, knowledge_base)
+        removed = [doc_id for doc_id in db.scalars(select(KnowledgeItem.doc_id)) if doc_id not in knowledge]
+        delete_knowledge_items(db, removed)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    pipeline.write_json(pipeline.KNOWLEDGE_ARTIFACT, knowledge)
+
+    topics_digest = file_digest(TOPICS_PATH)
+    topics_changed = (topics_digest != watermark.get("topics_digest")
+                      or not pipeline.artifact_path(pipeline.TOPICS_ARTIFACT).exists())
+    if topics_changed:
+        pipeline.write_json(pipeline.TOPICS_ARTIFACT, topic_snapshot(TOPICS_PATH))
+
+    pipeline.write_watermark("update_database", {"topics_digest": topics_digest})
+    print(f"Database update: {changed} knowledge items changed, {len(removed)} removed, "
+          f"topics {'changed' if topics_changed else 'unchanged'}")
+    return {"knowledge_changed": changed, "knowledge_removed": len(removed), "topics_changed": topics_changed}
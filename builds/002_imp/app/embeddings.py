@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+from .local_sqlite import LocalSQLite
+
+# Which embedder ChromaDB collections use: hashing (deterministic, no model
+# files), local (a sentence-transformers model from EMBEDDING_MODEL_PATH) or
+# default (Chroma's built-in model, downloaded on first use)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing").lower()
+EMBEDDING_MODEL_PATH = os.getenv("EMBEDDING_MODEL_PATH", "")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "384"))
+# Texts embedded per model call
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+# On-disk cache of embeddings keyed by content hash; empty disables it
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.db")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Keys looked up per SELECT, below SQLite's bound-parameter limit
+_CACHE_LOOKUP_CHUNK = 500
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length, leaving all-zero rows as they are"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class EmbeddingCache:
+    """Embeddings stored in a local SQLite file, keyed by content hash"""
+
+    def __init__(self, path: str):
+        self._db = LocalSQLite(path, timeout=30)
+        with self._db.connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+            )
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        conn = self._db.connect()
+        found = {}
+        for start in range(0, len(keys), _CACHE_LOOKUP_CHUNK):
+            chunk = keys[start:start + _CACHE_LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob in conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ):
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        conn = self._db.connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items())
+            )
+
+class CachedEmbeddingFunction(EmbeddingFunction, ABC):
+    """Base for the local embedders: batching, normalization and the on-disk cache.
+
+    Subclasses implement _embed() for one batch. Texts already in the cache,
+    or repeated within a call, are not embedded again, so re-ingesting an
+    unchanged corpus costs only the cache lookups.
+    """
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE,
+                 cache_path: Optional[str] = EMBEDDING_CACHE_PATH):
+        self.batch_size = batch_size
+        self.cache = EmbeddingCache(cache_path) if cache_path else None
+
+    @abstractmethod
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed one batch of texts; rows are normalized by the caller"""
+
+    def cache_namespace(self) -> str:
+        """Identifies this embedder's settings so a config change never reuses old vectors"""
+        return json.dumps({"name": self.name(), **self.get_config()}, sort_keys=True)
+
+    def __call__(self, input):
+        texts = list(input)
+        namespace = self.cache_namespace()
+        keys = [
+            hashlib.sha256(f"{namespace}\n{text}".encode("utf-8")).hexdigest()
+            for text in texts
+        ]
+        vectors = self.cache.get_many(list(dict.fromkeys(keys))) if self.cache else {}
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.batch_size):
+            batch_keys = missing_keys[start:start + self.batch_size]
+            batch = l2_normalize(
+                np.asarray(self._embed([missing[key] for key in batch_keys]), dtype=np.float32)
+            )
+            computed = dict(zip(batch_keys, batch))
+            vectors.update(computed)
+            if self.cache:
+                self.cache.put_many(computed)
+
+        return np.stack([vectors[key] for key in keys]).tolist() if keys else []
+
+class HashingEmbeddingFunction(CachedEmbeddingFunction):
+    """Deterministic bag-of-words embedder using the signed hashing trick.
+
+    Unigrams and bigrams are hashed with CRC32 into a fixed number of
+    dimensions. No model files or network access are needed and the same
+    text always produces the same vector.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS, **kwargs):
+        super().__init__(**kwargs)
+        self.dimensions = dimensions
+
+    @staticmethod
+    def name() -> str:
+        return "curiousbot_hashing"
+
+    def get_config(self) -> Dict:
+        return {"dimensions": self.dimensions}
+
+    @staticmethod
+    def build_from_config(config: Dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(dimensions=config["dimensions"])
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                columns.append(digest % self.dimensions)
+                signs.append(1.0 if digest & 0x80000000 else -1.0)
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)),
+                  np.asarray(signs, dtype=np.float32))
+        return matrix
+
+class LocalModelEmbeddingFunction(CachedEmbeddingFunction):
+    """sentence-transformers model loaded from a local directory, run on CPU"""
+
+    def __init__(self, model_path: str = EMBEDDING_MODEL_PATH, **kwargs):
+        super().__init__(**kwargs)
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "EMBEDDING_BACKEND=local requires the sentence-transformers package"
+            ) from e
+        if not model_path:
+            raise ValueError("EMBEDDING_BACKEND=local requires EMBEDDING_MODEL_PATH")
+        self.model_path = model_path
+        self.model = SentenceTransformer(model_path, device="cpu")
+
+    @staticmethod
+    def name() -> str:
+        return "curiousbot_local"
+
+    def get_config(self) -> Dict:
+        return {"model_path": os.path.abspath(self.model_path)}
+
+    @staticmethod
+    def build_from_config(config: Dict) -> "LocalModelEmbeddingFunction":
+        return LocalModelEmbeddingFunction(model_path=config["model_path"])
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
+
+_embedding_function = None
+_embedding_lock = threading.Lock()
+
+def get_embedding_function():
+    """The embedder configured by EMBEDDING_BACKEND, created once per process.
+
+    Returns None for the default backend so Chroma uses its built-in model.
+    """
+    global _embedding_function
+    if EMBEDDING_BACKEND == "default":
+        return None
+    with _embedding_lock:
+        if _embedding_function is None:
+            if EMBEDDING_BACKEND == "hashing":
+                _embedding_function = HashingEmbeddingFunction()
+            elif EMBEDDING_BACKEND == "local":
+                _embedding_function = LocalModelEmbeddingFunction()
+            else:
+                raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+    return _embedding_function
+
+def embedding_id(embedding_function) -> str:
+    """A short identifier for the embedder, stored with synced documents"""
+    if embedding_function is None:
+        return "default"
+    return hashlib.sha256(embedding_function.cache_namespace().encode("utf-8")).hexdigest()[:16]
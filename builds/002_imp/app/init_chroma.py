@@ -1,26 +1,151 @@
 import chromadb
-from .data_definitions import CATEGORIES, KNOWLEDGE_BASE
+import hashlib
+import json
+from typing import Dict, List, Optional
+from . import pipeline
+from .embeddings import embedding_id, get_embedding_function
 
-def init_chroma():
+# Number of documents embedded and written per upsert call
+SYNC_BATCH_SIZE = 256
+
+def get_collection(chroma_client, name: str, rebuild_on_conflict: bool = False, searchable: bool = True):
+    """Get or create a collection that embeds with the configured embedding function.
+
+    If the collection was created with a different embedding function, Chroma
+    refuses to open it. With rebuild_on_conflict, which only the sync path
+    sets since it re-fills the collection afterwards, it is dropped and
+    recreated; otherwise the conflict is raised. Collections that are
+    never searched by similarity (searchable=False) are opened without an
+    embedding function, so they open whichever embedder created them.
+    """
+    embedding_function = get_embedding_function()
+    kwargs = {"embedding_function": embedding_function} if embedding_function is not None else {}
+    try:
+        if searchable:
+            collection = chroma_client.get_collection(name, **kwargs)
+        else:
+            collection = chroma_client.get_collection(name, embedding_function=None)
+        print(f"Found existing {name} collection")
+        return collection
+    except ValueError as e:
+        # Older Chroma versions also raise ValueError for a missing collection
+        if "conflict" in str(e).lower():
+            if not rebuild_on_conflict:
+                raise ValueError(
+                    f"The {name} collection was built with a different embedding function; "
+                    "run python -m app.init_chroma to rebuild it"
+                ) from e
+            print(f"Embedding function changed, rebuilding {name} collection")
+            chroma_client.delete_collection(name)
+    except Exception:
+        pass
+    # get_or_create, since other workers may be creating the same collection
+    collection = chroma_client.get_or_create_collection(name, **kwargs)
+    print(f"Created new {name} collection")
+    return collection
+
+def init_chroma(rebuild_on_conflict: bool = False):
     # Initialize ChromaDB client
     chroma_client = chromadb.PersistentClient(path="data/chroma")
-    
-    # Create or get collections
-    try:
-        knowledge_base = chroma_client.get_collection("knowledge_base")
-        print("Found existing knowledge_base collection")
-    except:
-        knowledge_base = chroma_client.create_collection("knowledge_base")
-        print("Created new knowledge_base collection")
-        
-    try:
-        user_progress = chroma_client.get_collection("user_progress")
-        print("Found existing user_progress collection")
-    except:
-        user_progress = chroma_client.create_collection("user_progress")
-        print("Created new user_progress collection")
-    
+
+    # Create or get collections; only the sync path rebuilds the knowledge base,
+    # since it re-fills it from KNOWLEDGE_BASE afterwards
+    get_collection(chroma_client, "knowledge_base", rebuild_on_conflict=rebuild_on_conflict)
+    get_collection(chroma_client, "user_progress", searchable=False)
+
     return chroma_client
 
+def content_hash(document: str, metadata: Dict) -> str:
+    """Hash a document together with its metadata so either change is detected"""
+    payload = json.dumps({"document": document, "metadata": metadata}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def build_knowledge_documents(knowledge: Dict[str, Dict], embedder: str = "") -> List[Dict]:
+    """Turn knowledge snapshot items into the documents stored in the knowledge_base collection.
+
+    The embedder id is stored with each document, so switching embedding
+    functions changes every hash and re-embeds the whole collection.
+    """
+    documents = []
+    for doc_id, item in knowledge.items():
+        metadata = {
+            "category": item["category_name"],
+            "difficulty": item["difficulty"],
+            "type": item["type"],
+            "source": item["source"],
+            "embedder": embedder
+        }
+        metadata["content_hash"] = content_hash(item["content"], metadata)
+        documents.append({
+            "id": doc_id,
+            "document": item["content"],
+            "metadata": metadata
+        })
+    return documents
+
+def sync_knowledge_base(collection, documents: List[Dict], batch_size: int = SYNC_BATCH_SIZE) -> int:
+    """Upsert only new or changed documents into the collection, in batches.
+
+    Existing hashes are read back from the collection metadata, so running
+    the sync again on an unchanged corpus embeds nothing.
+    """
+    stored_hashes = {}
+    for start in range(0, len(documents), batch_size):
+        batch_ids = [doc["id"] for doc in documents[start:start + batch_size]]
+        existing = collection.get(ids=batch_ids, include=["metadatas"])
+        for doc_id, metadata in zip(existing["ids"], existing["metadatas"]):
+            stored_hashes[doc_id] = (metadata or {}).get("content_hash")
+
+    changed = [
+        doc for doc in documents
+        if stored_hashes.get(doc["id"]) != doc["metadata"]["content_hash"]
+    ]
+    for start in range(0, len(changed), batch_size):
+        batch = changed[start:start + batch_size]
+        collection.upsert(
+            ids=[doc["id"] for doc in batch],
+            documents=[doc["document"] for doc in batch],
+            metadatas=[doc["metadata"] for doc in batch]
+        )
+
+    print(f"Knowledge base sync: {len(changed)} of {len(documents)} documents upserted")
+    return len(changed)
+
+def update_chroma_db(knowledge: Optional[Dict[str, Dict]] = None) -> int:
+    """Pipeline stage: sync knowledge items changed since this stage last ran into ChromaDB.
+
+    Reads the knowledge snapshot written by update_database, or builds one
+    from KNOWLEDGE_BASE when there is none. Item hashes and the embedder id
+    are compared with this stage's watermark, so only changed items are
+    looked up and embedded, and removed items are deleted. If the
+    collection doesn't hold what the watermark says (for example after it
+    was rebuilt), every item is checked against the collection instead, and
+    documents it holds that are no longer in the knowledge base are deleted.
+    """
+    if knowledge is None:
+        knowledge = pipeline.read_json(pipeline.KNOWLEDGE_ARTIFACT) or pipeline.knowledge_snapshot()
+    embedder = embedding_id(get_embedding_function())
+    current = {doc_id: f"{item['hash']}:{embedder}" for doc_id, item in knowledge.items()}
+
+    chroma_client = init_chroma(rebuild_on_conflict=True)
+    knowledge_base = get_collection(chroma_client, "knowledge_base")
+    watermark = pipeline.read_watermark("update_chroma_db")
+    if knowledge_base.count() != len(watermark):
+        # Every item gets checked against the collection; anything it holds
+        # that is no longer in the knowledge base is removed
+        changed = list(current)
+        removed = [doc_id for doc_id in knowledge_base.get(include=[])["ids"] if doc_id not in current]
+    else:
+        changed, removed = pipeline.diff_hashes(current, watermark)
+
+    if removed:
+        knowledge_base.delete(ids=removed)
+    upserted = sync_knowledge_base(
+        knowledge_base, build_knowledge_documents({doc_id: knowledge[doc_id] for doc_id in changed}, embedder)
+    )
+    pipeline.write_watermark("update_chroma_db", current)
+    print(f"ChromaDB update: {len(changed)} changed, {len(removed)} removed, {upserted} embedded")
+    return upserted
+
 if __name__ == "__main__":
-    init_chroma() 
\ No newline at end of file
+    update_chroma_db(pipeline.knowledge_snapshot())
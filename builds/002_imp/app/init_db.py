@@ -1,55 +1,121 @@
+from typing import Dict, Iterable, List
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.orm import Session
 from .database import engine, Base
+from .migrations import migrate
 from .models import Category, KnowledgeItem
 from .data_definitions import CATEGORIES, KNOWLEDGE_BASE
 
+# Rows sent per executemany batch when seeding knowledge items
+SEED_BATCH_SIZE = 5000
+
+def seed_categories(db: Session, categories: List[Dict]) -> int:
+    """Insert the categories that don't exist yet, reading existing ids in one query"""
+    existing = set(db.scalars(select(Category.id)))
+    new_categories = []
+    for category in categories:
+        if category["id"] in existing:
+            print(f"Category already exists: {category['name']}")
+            continue
+        existing.add(category["id"])
+        new_categories.append({
+            "id": category["id"],
+            "name": category["name"],
+            "description": category["description"]
+        })
+        print(f"Added category: {category['name']}")
+    if new_categories:
+        db.execute(insert(Category), new_categories)
+    return len(new_categories)
+
+def seed_knowledge_items(db: Session, knowledge_base: Dict[str, Iterable[Dict]],
+                         batch_size: int = SEED_BATCH_SIZE) -> int:
+    """Insert new knowledge items and update changed ones, in executemany batches.
+
+    Items are keyed by doc_id, the id of their ChromaDB document, which the
+    unique index on knowledge_items backs. Existing rows are read in one
+    query without their content; a row is only rewritten when its content
+    hash or metadata differ. Returns the number of rows inserted or updated.
+    """
+    table = KnowledgeItem.__table__
+    existing = {
+        row.doc_id: row for row in db.execute(select(
+            table.c.id, table.c.doc_id, table.c.content_hash, table.c.type,
+            table.c.source, table.c.difficulty, table.c.category_id
+        ))
+    }
+    # Later items replace earlier ones with the same doc_id, as in the pipeline snapshot
+    wanted = {}
+    for category_id, items in knowledge_base.items():
+        for item in items:
+            wanted[KnowledgeItem.make_doc_id(category_id, item["type"], item["source"])] = {
+                "content": item["content"],
+                "content_hash": KnowledgeItem.hash_content(item["content"]),
+                "type": item["type"],
+                "source": item["source"],
+                "difficulty": item["difficulty"],
+                "category_id": category_id
+            }
+
+    update = (
+        table.update()
+        .where(table.c.id == bindparam("row_id"))
+        .values({column: bindparam(f"new_{column}") for column in
+                 ("content", "content_hash", "type", "source", "difficulty", "category_id")})
+    )
+    inserts, updates = [], []
+    added = updated = 0
+    for doc_id, values in wanted.items():
+        row = existing.get(doc_id)
+        if row is None:
+            inserts.append({"doc_id": doc_id, **values})
+        elif any(getattr(row, column) != values[column] for column in
+                 ("content_hash", "type", "source", "difficulty", "category_id")):
+            updates.append({"row_id": row.id, **{f"new_{column}": value for column, value in values.items()}})
+        if len(inserts) >= batch_size:
+            db.execute(insert(KnowledgeItem), inserts)
+            added += len(inserts)
+            inserts = []
+        if len(updates) >= batch_size:
+            db.execute(update, updates)
+            updated += len(updates)
+            updates = []
+    if inserts:
+        db.execute(insert(KnowledgeItem), inserts)
+        added += len(inserts)
+    if updates:
+        db.execute(update, updates)
+        updated += len(updates)
+    print(f"Added {added} knowledge items, updated {updated}, {len(wanted) - added - updated} unchanged")
+    return added + updated
+
+def delete_knowledge_items(db: Session, doc_ids: List[str], batch_size: int = SEED_BATCH_SIZE) -> int:
+    """Delete the knowledge items with the given doc_ids"""
+    table = KnowledgeItem.__table__
+    deleted = 0
+    for start in range(0, len(doc_ids), batch_size):
+        result = db.execute(table.delete().where(table.c.doc_id.in_(doc_ids[start:start + batch_size])))
+        deleted += result.rowcount
+    print(f"Deleted {deleted} knowledge items")
+    return deleted
+
 def init_db():
     # Create all tables
     Base.metadata.create_all(bind=engine)
-    
+    migrate(engine)
+
     # Create a new session
     db = Session(engine)
-    
+
     try:
-        # Add categories if they don't exist
-        for category in CATEGORIES:
-            existing_category = db.query(Category).filter(Category.id == category["id"]).first()
-            if not existing_category:
-                db_category = Category(
-                    id=category["id"],
-                    name=category["name"],
-                    description=category["description"]
-                )
-                db.add(db_category)
-                print(f"Added category: {category['name']}")
-            else:
-                print(f"Category already exists: {category['name']}")
-        
-        # Add knowledge items if they don't exist
-        for category_id, items in KNOWLEDGE_BASE.items():
-            for item in items:
-                existing_item = db.query(KnowledgeItem).filter(
-                    KnowledgeItem.content == item["content"],
-                    KnowledgeItem.category_id == category_id
-                ).first()
-                
-                if not existing_item:
-                    db_item = KnowledgeItem(
-                        content=item["content"],
-                        type=item["type"],
-                        source=item["source"],
-                        difficulty=item["difficulty"],
-                        category_id=category_id
-                    )
-                    db.add(db_item)
-                    print(f"Added knowledge item for category: {category_id}")
-                else:
-                    print(f"Knowledge item already exists for category: {category_id}")
-        
+        # Add categories that don't exist yet, and new or changed knowledge items
+        seed_categories(db, CATEGORIES)
+        seed_knowledge_items(db, KNOWLEDGE_BASE)
+
         # Commit all changes
         db.commit()
         print("Database initialized successfully!")
-        
+
     except Exception as e:
         print(f"Error initializing database: {e}")
         db.rollback()
@@ -57,4 +123,4 @@ def init_db():
         db.close()
 
 if __name__ == "__main__":
-    init_db() 
\ No newline at end of file
+    init_db()
@@ -0,0 +1,69 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from fastapi.responses import JSONResponse, Response
+
+# orjson is optional; without it responses are encoded with the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Maximum number of pre-serialized response bodies kept per cache
+RENDERED_CACHE_SIZE = 4096
+
+def dumps(content: Any) -> bytes:
+    """Encode plain JSON data (dicts, lists, strings, numbers) to UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when available.
+
+    Return it directly from an endpoint so FastAPI skips jsonable_encoder;
+    the content must already be plain JSON data.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class RenderedJSONResponse(Response):
+    """Response whose body is JSON that was serialized ahead of time"""
+    media_type = "application/json"
+
+class RenderedCache:
+    """Serialized response bodies, rendered once per data version.
+
+    Entries are keyed by request and tagged with the version of the data
+    they were built from; when the version changes the whole cache is
+    dropped. A build returning None (not found) is cached as None too.
+    """
+
+    def __init__(self, max_entries: int = RENDERED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.version = None
+        self._entries: "OrderedDict[Hashable, Optional[bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> Optional[bytes]:
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        content = build()
+        body = None if content is None else dumps(content)
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = body
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return body
+
+    def __len__(self) -> int:
+        return len(self._entries)
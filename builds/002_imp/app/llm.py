@@ -0,0 +1,65 @@
+import asyncio
+import os
+from typing import Optional
+from fastapi import Request
+
+# Per-call timeout for Gemini requests, in seconds
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+# Maximum number of Gemini calls in flight per worker
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+# How often to check whether the client that asked for a question has gone away
+DISCONNECT_POLL_INTERVAL = 0.5
+
+class LLMTimeoutError(Exception):
+    """The model did not answer within the configured timeout"""
+
+class ClientDisconnectedError(Exception):
+    """The HTTP client went away before the model answered"""
+
+class GeminiClient:
+    """Non-blocking wrapper around a Gemini GenerativeModel.
+
+    Calls go through the model's async API so the event loop keeps serving
+    other requests during the round-trip. A semaphore bounds how many calls
+    a worker has in flight. Every call has a timeout that includes any wait
+    for a free slot, and a call made on behalf of a request is cancelled,
+    queued or not, if that client disconnects.
+    """
+
+    def __init__(self, model, timeout: float = GEMINI_TIMEOUT,
+                 max_concurrency: int = GEMINI_MAX_CONCURRENCY):
+        self.model = model
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _call(self, prompt: str) -> str:
+        async with self._semaphore:
+            response = await self.model.generate_content_async(
+                prompt, request_options={"timeout": self.timeout}
+            )
+        return response.text
+
+    async def generate(self, prompt: str, request: Optional[Request] = None) -> str:
+        """Generate text for a prompt, honouring the timeout and client disconnects"""
+        call = asyncio.ensure_future(self._call(prompt))
+        waiters = {call}
+        if request is not None:
+            waiters.add(asyncio.ensure_future(_wait_for_disconnect(request)))
+        try:
+            done, _ = await asyncio.wait(
+                waiters, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.cancel()
+
+        if call in done:
+            return call.result()
+        if done:
+            raise ClientDisconnectedError("Client disconnected before the question was generated")
+        raise LLMTimeoutError(f"Gemini did not respond within {self.timeout:.0f} seconds")
+
+async def _wait_for_disconnect(request: Request):
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
@@ -0,0 +1,26 @@
+import sqlite3
+import threading
+
+class LocalSQLite:
+    """A SQLite file on local disk, shared by every worker process on the host.
+
+    Each thread gets its own connection. WAL lets readers run alongside the
+    single writer, and synchronous=NORMAL skips an fsync per commit, which
+    at worst loses the last few writes of state that can be rebuilt.
+    """
+
+    def __init__(self, path: str, timeout: float = 5, **connect_args):
+        self.path = path
+        self.timeout = timeout
+        self._connect_args = connect_args
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, **self._connect_args)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
@@ -1,59 +1,73 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os
-import chromadb
 import json
+import asyncio
 from datetime import datetime
-import random
-import time
-from collections import defaultdict
+from contextlib import asynccontextmanager
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from . import models
-from .database import engine, get_db
-from .init_chroma import init_chroma
-from .data_definitions import CATEGORIES, KNOWLEDGE_BASE
-from .topic_utils import TopicManager
-
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
 
-# Load environment variables
+# Load environment variables before the app modules read their settings
 load_dotenv()
 
-# Rate limiting configuration
-RATE_LIMIT_WINDOW = 60  # 1 minute window
-MAX_REQUESTS_PER_WINDOW = 10  # Maximum requests per minute
-request_timestamps = defaultdict(list)
-
-def check_rate_limit():
-    """Check if the current request should be rate limited."""
-    current_time = time.time()
-    window_start = current_time - RATE_LIMIT_WINDOW
-    
-    # Clean up old timestamps
-    request_timestamps['global'] = [ts for ts in request_timestamps['global'] if ts > window_start]
-    
-    # Check if we've exceeded the rate limit
-    if len(request_timestamps['global']) >= MAX_REQUESTS_PER_WINDOW:
-        return False
-    
-    # Add current timestamp
-    request_timestamps['global'].append(current_time)
-    return True
+from . import models
+from .database import SessionLocal, get_db
+from .http_cache import cache_headers, etag_matches, make_etag, not_modified
+from .json_response import FastJSONResponse, RenderedCache, RenderedJSONResponse, dumps
+from .llm import GeminiClient, LLMTimeoutError, ClientDisconnectedError
+from .progress_writer import ProgressWriter
+from .question_pool import QuestionPool
+from .quiz import (
+    MAX_BATCH_SIZE, VALID_DIFFICULTIES, build_batch_prompt, build_context, build_prompt,
+    parse_question, parse_questions
+)
+from .rate_limit import create_rate_limiter
+from .resources import AppResources
+from .response_cache import create_response_cache
+from .retrieval import CONTEXT_SOURCE, retrieve_fragments, retrieval_query
+
+# Page sizes for the debug listing endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows fetched per round-trip when streaming NDJSON
+STREAM_CHUNK_SIZE = 1000
+
+# Per-client, per-route rate limiting
+rate_limiter = create_rate_limiter()
 
 # Configure Gemini
 api_key = os.getenv("GEMINI_API_KEY")
 if not api_key:
     raise ValueError("GEMINI_API_KEY not found in environment variables")
 
+# Process-wide resources (database tables, topics, ChromaDB) are created
+# once per worker by the lifespan hook rather than at import time
+resources = AppResources()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await resources.startup()
+    progress_writer.start()
+    if question_pool.enabled:
+        question_pool.start(
+            (category.id, difficulty)
+            for category in resources.categories.all()
+            for difficulty in VALID_DIFFICULTIES
+        )
+    yield
+    await question_pool.stop()
+    await asyncio.to_thread(progress_writer.stop)
+    await resources.shutdown()
+
 # Initialize FastAPI app
-app = FastAPI(title="AI Study Buddy")
+app = FastAPI(title="AI Study Buddy", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -67,45 +81,10 @@ def check_rate_limit():
 # Initialize Gemini
 genai.configure(api_key=api_key)
 model = genai.GenerativeModel('gemini-1.5-pro')
+llm = GeminiClient(model)
 
-# Initialize ChromaDB
-try:
-    chroma_client = init_chroma()
-    knowledge_base = chroma_client.get_collection("knowledge_base")
-    user_progress = chroma_client.get_collection("user_progress")
-    print("ChromaDB initialized successfully")
-except Exception as e:
-    print(f"Error initializing ChromaDB: {str(e)}")
-    raise
-
-# Load knowledge base into ChromaDB
-print("Loading knowledge base into ChromaDB...")
-for category_id, items in KNOWLEDGE_BASE.items():
-    category = next((cat for cat in CATEGORIES if cat["id"] == category_id), None)
-    if not category:
-        continue
-        
-    for item in items:
-        try:
-            knowledge_base.add(
-                documents=[item["content"]],
-                metadatas=[{
-                    "category": category["name"],
-                    "difficulty": item["difficulty"],
-                    "type": item["type"],
-                    "source": item["source"]
-                }],
-                ids=[f"{category_id}_{item['type']}_{item['source']}"]
-            )
-            print(f"Added {item['type']} content for category: {category_id}")
-        except Exception as e:
-            print(f"Error adding content for {category_id}: {str(e)}")
-            continue
-
-print("Knowledge base loaded successfully!")
-
-# Initialize TopicManager
-topic_manager = TopicManager()
+# The knowledge base is synced into ChromaDB by `python -m app.init_chroma`
+# (or the update_chroma_db pipeline task), not on every worker start
 
 # Mount static files after all initializations
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -122,33 +101,123 @@ async def read_root():
     """Serve the main HTML file."""
     return FileResponse("index.html", media_type="text/html")
 
-@app.get("/categories")
-async def get_categories(db: Session = Depends(get_db)):
+@app.get("/health/live")
+async def liveness():
+    """Report that the worker process is up."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Report whether every backing resource has finished loading."""
+    components = resources.readiness()
+    status_code = 200 if resources.ready else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "ready" if resources.ready else "starting", "components": components}
+    )
+
+# Serialized /categories body, rebuilt when the cached categories change
+category_responses = RenderedCache(max_entries=1)
+
+@app.get("/categories", response_class=RenderedJSONResponse)
+async def get_categories(request: Request):
     """Get all available quiz categories."""
-    categories = db.query(models.Category).all()
-    return {"categories": [
-        {
-            "id": cat.id,
-            "name": cat.name,
-            "description": cat.description
-        }
-        for cat in categories
-    ]}
-
-@app.post("/quiz/{category_id}")
-async def generate_question(category_id: str, difficulty: str = "beginner", db: Session = Depends(get_db)):
+    version = resources.categories.version
+    etag = make_etag("categories", version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    body = category_responses.get("categories", version, lambda: {"categories": [
+        category.to_dict() for category in resources.categories.all()
+    ]})
+    return RenderedJSONResponse(body, headers=cache_headers(etag))
+
+def build_topic_context(category_name: str) -> str:
+    """Build prompt context from the topics matching a category name."""
+    # Get all topics that match the category name
+    topics = resources.topic_manager.get_topics_by_name(category_name)
+    print(f"Found {len(topics)} topics for category '{category_name}'")
+    if not topics:
+        raise LookupError(f"No topics found for category: {category_name}")
+    return build_context(topics)
+
+async def build_question_contexts(category_name: str, difficulty: str, count: int) -> List[str]:
+    """Build prompt context for count questions from topics and/or knowledge base search, per CONTEXT_SOURCE.
+
+    Knowledge for every question is retrieved with one search call.
+    """
+    contexts = [""] * count
+    if CONTEXT_SOURCE in ("topics", "hybrid"):
+        contexts = [build_topic_context(category_name) for _ in range(count)]
+
+    if CONTEXT_SOURCE in ("retrieval", "hybrid") and resources.knowledge_base is not None:
+        try:
+            fragments = await asyncio.to_thread(
+                retrieve_fragments, resources.knowledge_base, category_name, difficulty,
+                [retrieval_query(category_name, context) for context in contexts]
+            )
+        except Exception as e:
+            print(f"Error retrieving knowledge base context: {e}")
+            fragments = [[] for _ in contexts]
+        for index, question_fragments in enumerate(fragments):
+            if question_fragments:
+                retrieved = "\n".join(f"Knowledge: {fragment}" for fragment in question_fragments)
+                contexts[index] = f"{contexts[index]}\n{retrieved}" if contexts[index] else retrieved
+
+    # Fall back to topics when retrieval is the only source and returned nothing
+    return [context or build_topic_context(category_name) for context in contexts]
+
+async def build_question_context(category_name: str, difficulty: str) -> str:
+    """Build prompt context for one question, per CONTEXT_SOURCE."""
+    return (await build_question_contexts(category_name, difficulty, 1))[0]
+
+def question_progress(category_id: str, difficulty: str, question_data: dict, question_id: str) -> dict:
+    """The user progress row recorded for a served question"""
+    return dict(
+        question_id=question_id,
+        category_id=category_id,
+        type="question",
+        content=json.dumps(question_data),
+        difficulty=difficulty,
+        **models.UserProgress.promoted_fields("question", question_data)
+    )
+
+def store_question(category_id: str, difficulty: str, question_data: dict):
+    """Queue a served question for user progress, continuing if storage fails."""
+    try:
+        progress_writer.add(**question_progress(
+            category_id, difficulty, question_data, f"q-{datetime.now().timestamp()}"
+        ))
+    except Exception as e:
+        print(f"Error storing question in user progress: {e}")
+
+def store_questions(category_id: str, difficulty: str, questions: List[dict]):
+    """Queue a batch of served questions for user progress as one transaction."""
+    timestamp = datetime.now().timestamp()
+    try:
+        progress_writer.add_many([
+            question_progress(category_id, difficulty, question_data, f"q-{timestamp}-{index}")
+            for index, question_data in enumerate(questions)
+        ])
+    except Exception as e:
+        print(f"Error storing questions in user progress: {e}")
+
+async def generate_pool_question(category_id: str, difficulty: str) -> dict:
+    """Generate a question for the background pool."""
+    category_name = resources.categories.get(category_id).name
+    prompt = build_prompt(category_name, difficulty, await build_question_context(category_name, difficulty))
+    return parse_question(await llm.generate(prompt))
+
+question_pool = QuestionPool(generate_pool_question)
+response_cache = create_response_cache()
+progress_writer = ProgressWriter()
+
+@app.post("/quiz/{category_id}", dependencies=[Depends(rate_limiter.limit("quiz"))])
+async def generate_question(category_id: str, request: Request, difficulty: str = "beginner"):
     """Generate a new question for the specified category."""
     print(f"Generating question for category: {category_id} with difficulty: {difficulty}")
-    
-    # Check rate limit
-    if not check_rate_limit():
-        raise HTTPException(
-            status_code=429,
-            detail="Rate limit exceeded. Please wait a moment before trying again."
-        )
-    
-    # Validate category
-    category = db.query(models.Category).filter(models.Category.id == category_id).first()
+
+    # Validate category against the in-process category cache
+    category = resources.categories.get(category_id)
     if not category:
         print(f"Invalid category ID: {category_id}")
         raise HTTPException(status_code=400, detail=f"Invalid category ID: {category_id}")
@@ -156,285 +225,310 @@ async def generate_question(category_id: str, difficulty: str = "beginner", db:
     print(f"Found category: {category.name}")
 
     # Validate difficulty
-    valid_difficulties = ["beginner", "intermediate", "advanced"]
-    if difficulty not in valid_difficulties:
+    if difficulty not in VALID_DIFFICULTIES:
         print(f"Invalid difficulty: {difficulty}")
-        raise HTTPException(status_code=400, detail=f"Invalid difficulty. Must be one of: {', '.join(valid_difficulties)}")
+        raise HTTPException(status_code=400, detail=f"Invalid difficulty. Must be one of: {', '.join(VALID_DIFFICULTIES)}")
+
+    # Serve a pre-generated question when one is ready
+    question_data = question_pool.pop((category_id, difficulty))
+    if question_data is not None:
+        print("Serving question from pool")
+        store_question(category_id, difficulty, question_data)
+        return question_data
 
-    # Get relevant topics for the category
+    # Get relevant topics and knowledge for the category
     try:
-        # Get all topics that match the category name
-        topics = topic_manager.get_topics_by_name(category.name)
-        print(f"Found {len(topics)} topics for category '{category.name}':")
-        for topic in topics:
-            print(f"- Topic ID: {topic['id']}, Topic: {topic['topic']}")
-        
-        if not topics:
-            raise HTTPException(status_code=404, detail=f"No topics found for category: {category.name}")
-        
-        # Randomly select up to 5 topics for context
-        selected_topics = random.sample(topics, min(5, len(topics)))
-        print(f"\nSelected {len(selected_topics)} topics for context:")
-        
-        # Build context with more variety
-        context = []
-        for topic in selected_topics:
-            print(f"\nUsing topic: {topic['topic']} (ID: {topic['id']})")
-            
-            # Randomly select which aspects to include
-            aspects = [
-                ("Definition", topic['definition']),
-                ("Use Case", topic['use_case']),
-                ("Benefits", ', '.join(topic['benefits'])),
-                ("Challenges", ', '.join(topic['challenges'])),
-                ("Relation to LLMs", topic['relation_to_LLMs'])
-            ]
-            
-            # Randomly select 2-3 aspects for each topic
-            selected_aspects = random.sample(aspects, random.randint(2, 3))
-            for aspect_name, aspect_value in selected_aspects:
-                context.append(f"{aspect_name}: {aspect_value}")
-        
-        # Shuffle the context to avoid predictable patterns
-        random.shuffle(context)
-        context = "\n".join(context)
-        print("\nGenerated context length:", len(context))
-        
+        context = await build_question_context(category.name, difficulty)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         print(f"Error getting topics: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve topics")
 
+    # Reuse a cached answer to an equivalent prompt when allowed
+    cache_key = response_cache.fingerprint(category.name, difficulty, context)
+    question_data = await response_cache.get(cache_key)
+    if question_data is not None:
+        print("Serving question from response cache")
+        store_question(category_id, difficulty, question_data)
+        return question_data
+
     # Generate question using Gemini with improved prompt
-    prompt = f"""You are a quiz generator for teaching about {category.name}. 
-    Using this context: {context}
-    
-    Generate a {difficulty}-level multiple choice question that tests understanding of {category.name}.
-    
-    IMPORTANT: Make this question DIFFERENT from typical questions by:
-    1. Using varied question types:
-       - "What is..." (definition/explanation)
-       - "Why is..." (reasoning/analysis)
-       - "How does..." (process/mechanism)
-       - "Which of the following..." (comparison/selection)
-       - "In what scenario..." (application)
-       - "What would happen if..." (hypothetical)
-       - "Which statement best describes..." (analysis)
-       - "What are the key differences between..." (comparison)
-       - "How would you implement..." (practical application)
-       - "What are the potential risks of..." (critical thinking)
-    
-    2. Varying cognitive levels:
-       - Beginner: Focus on definitions, basic concepts, and simple relationships
-       - Intermediate: Focus on applications, comparisons, and practical scenarios
-       - Advanced: Focus on analysis, troubleshooting, and edge cases
-    
-    3. Using different question structures:
-       - Direct questions
-       - Scenario-based questions
-       - Problem-solving questions
-       - Comparison questions
-       - "What if" questions
-       - Case study questions
-       - Implementation questions
-       - Debugging questions
-    
-    4. Varying topics within {category.name}:
-       - Core concepts
-       - Implementation details
-       - Best practices
-       - Common challenges
-       - Real-world applications
-       - Edge cases
-       - Performance considerations
-       - Security implications
-    
-    5. Making options more interesting:
-       - Include partially correct answers
-       - Use realistic but incorrect alternatives
-       - Add common misconceptions as options
-       - Include "all of the above" or "none of the above" when appropriate
-    
-    Guidelines for {difficulty} level:
-    - Use clear, precise language
-    - Make options distinct and unambiguous
-    - Include a helpful explanation
-    - For beginner: focus on fundamental concepts
-    - For intermediate: focus on practical applications
-    - For advanced: focus on complex scenarios and edge cases
-    
-    Format your response as a valid JSON object with these exact fields:
-    - question: the question text
-    - options: array of 4 options prefixed with A), B), C), D)
-    - correct_answer: just the letter (A, B, C, or D)
-    - explanation: brief, easy-to-understand explanation of the correct answer
-    
-    Keep the response concise and ensure it's valid JSON."""
+    prompt = build_prompt(category.name, difficulty, context)
 
+    response_text = ""
     try:
         print("Generating question with Gemini...")
-        response = model.generate_content(prompt)
-        response_text = response.text
+        response_text = await llm.generate(prompt, request)
         print("Raw response:", response_text)
-        
-        # Clean the response text to ensure valid JSON
-        cleaned_text = response_text.strip()
-        if cleaned_text.startswith("```json"):
-            cleaned_text = cleaned_text[7:]
-        if cleaned_text.endswith("```"):
-            cleaned_text = cleaned_text[:-3]
-        cleaned_text = cleaned_text.strip()
-        
-        print("Cleaned response:", cleaned_text)
-        question_data = json.loads(cleaned_text)
-        
-        # Validate the response format
-        required_fields = ["question", "options", "correct_answer", "explanation"]
-        if not all(field in question_data for field in required_fields):
-            missing_fields = [field for field in required_fields if field not in question_data]
-            print(f"Missing required fields: {missing_fields}")
-            raise ValueError(f"Response missing required fields: {missing_fields}")
-        if len(question_data["options"]) != 4:
-            print(f"Invalid number of options: {len(question_data['options'])}")
-            raise ValueError("Response must have exactly 4 options")
-            
-        # Store question in user progress
-        try:
-            progress = models.UserProgress(
-                question_id=f"q-{datetime.now().timestamp()}",
-                category_id=category_id,
-                type="question",
-                content=json.dumps(question_data)
-            )
-            db.add(progress)
-            db.commit()
-            print("Question stored in user progress")
-        except Exception as e:
-            print(f"Error storing question in user progress: {e}")
-            db.rollback()
-            # Continue even if storage fails
-        
+        question_data = parse_question(response_text)
+        await response_cache.set(cache_key, question_data)
+        store_question(category_id, difficulty, question_data)
         return question_data
     except json.JSONDecodeError as je:
         print(f"JSON Decode Error: {je}")
         print("Response text:", response_text)
         raise HTTPException(status_code=500, detail="Failed to generate a valid question. Please try again.")
+    except LLMTimeoutError as e:
+        print(f"Gemini timeout: {e}")
+        raise HTTPException(status_code=504, detail="Question generation timed out. Please try again.")
+    except ClientDisconnectedError:
+        print("Client disconnected, cancelled question generation")
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
         print(f"Error type: {type(e)}")
         print(f"Error details: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An error occurred while generating the question: {str(e)}")
 
-@app.post("/feedback/{question_id}")
-async def submit_feedback(question_id: str, feedback: dict, db: Session = Depends(get_db)):
+@app.post("/quiz/{category_id}/batch", dependencies=[Depends(rate_limiter.limit("quiz"))])
+async def generate_question_batch(
+    category_id: str,
+    request: Request,
+    difficulty: str = "beginner",
+    n: int = Query(5, ge=1, le=MAX_BATCH_SIZE)
+):
+    """Generate up to n questions for the specified category with a single Gemini call.
+
+    Invalid questions in the model's response are dropped individually, so
+    fewer than n questions may be returned.
+    """
+    print(f"Generating {n} questions for category: {category_id} with difficulty: {difficulty}")
+
+    # Validate category against the in-process category cache
+    category = resources.categories.get(category_id)
+    if not category:
+        print(f"Invalid category ID: {category_id}")
+        raise HTTPException(status_code=400, detail=f"Invalid category ID: {category_id}")
+
+    # Validate difficulty
+    if difficulty not in VALID_DIFFICULTIES:
+        print(f"Invalid difficulty: {difficulty}")
+        raise HTTPException(status_code=400, detail=f"Invalid difficulty. Must be one of: {', '.join(VALID_DIFFICULTIES)}")
+
+    # One context per question, searched in a single call, merged without repeated lines
+    try:
+        contexts = await build_question_contexts(category.name, difficulty, n)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        print(f"Error getting topics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve topics")
+    context = "\n".join(dict.fromkeys(line for context in contexts for line in context.splitlines()))
+
+    prompt = build_batch_prompt(category.name, difficulty, context, n)
+
+    response_text = ""
+    try:
+        print("Generating question batch with Gemini...")
+        response_text = await llm.generate(prompt, request)
+        print("Raw response:", response_text)
+        questions, dropped = parse_questions(response_text)
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"Invalid batch response: {e}")
+        print("Response text:", response_text)
+        raise HTTPException(status_code=500, detail="Failed to generate valid questions. Please try again.")
+    except LLMTimeoutError as e:
+        print(f"Gemini timeout: {e}")
+        raise HTTPException(status_code=504, detail="Question generation timed out. Please try again.")
+    except ClientDisconnectedError:
+        print("Client disconnected, cancelled question generation")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except Exception as e:
+        print(f"Error type: {type(e)}")
+        print(f"Error details: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"An error occurred while generating the questions: {str(e)}")
+
+    questions = questions[:n]
+    if not questions:
+        raise HTTPException(status_code=500, detail="Failed to generate valid questions. Please try again.")
+    store_questions(category_id, difficulty, questions)
+    return {"questions": questions, "requested": n, "dropped": dropped}
+
+@app.post("/feedback/{question_id}", dependencies=[Depends(rate_limiter.limit("feedback"))])
+async def submit_feedback(question_id: str, feedback: dict):
     """Submit feedback for a question."""
     try:
-        progress = models.UserProgress(
+        progress_writer.add(
             question_id=question_id,
             type="feedback",
-            content=json.dumps(feedback)
+            content=json.dumps(feedback),
+            **models.UserProgress.promoted_fields("feedback", feedback)
         )
-        db.add(progress)
-        db.commit()
         return {"status": "success"}
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to save feedback: {str(e)}")
 
-@app.get("/debug/feedback")
-async def get_feedback(db: Session = Depends(get_db)):
-    """Get all feedback from user_progress"""
-    feedback_items = db.query(models.UserProgress).filter(
-        models.UserProgress.type == "feedback"
-    ).all()
+def feedback_item(item: models.UserProgress) -> dict:
     return {
-        "count": len(feedback_items),
-        "items": [
-            {
-                "id": item.id,
-                "question_id": item.question_id,
-                "timestamp": item.timestamp.isoformat(),
-                "content": json.loads(item.content)
-            }
-            for item in feedback_items
-        ]
+        "id": item.id,
+        "question_id": item.question_id,
+        "timestamp": item.timestamp.isoformat(),
+        "content": json.loads(item.content)
     }
 
-@app.get("/debug/knowledge")
-async def get_knowledge(db: Session = Depends(get_db)):
-    """Get all entries from knowledge_items"""
-    knowledge_items = db.query(models.KnowledgeItem).all()
+def knowledge_item(item: models.KnowledgeItem) -> dict:
     return {
-        "count": len(knowledge_items),
-        "items": [
-            {
-                "id": item.id,
-                "content": item.content,
-                "type": item.type,
-                "source": item.source,
-                "difficulty": item.difficulty,
-                "category_id": item.category_id,
-                "created_at": item.created_at.isoformat(),
-                "updated_at": item.updated_at.isoformat()
-            }
-            for item in knowledge_items
-        ]
+        "id": item.id,
+        "content": item.content,
+        "type": item.type,
+        "source": item.source,
+        "difficulty": item.difficulty,
+        "category_id": item.category_id,
+        "created_at": item.created_at.isoformat(),
+        "updated_at": item.updated_at.isoformat()
     }
 
-# Add new endpoints for topics
-@app.get("/topics")
-async def get_all_topics():
-    """Get all unique topics"""
-    return {"topics": topic_manager.get_unique_topics()}
-
-@app.get("/topics/{topic_id}")
-async def get_topic(topic_id: int):
-    """Get detailed information about a specific topic"""
-    topic = topic_manager.get_topic_by_id(topic_id)
-    if not topic:
+def paginate(query, id_column, after_id: Optional[int], limit: int):
+    """Fetch one keyset page ordered by id, returning the rows and the next cursor"""
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def stream_ndjson(statement, serialize):
+    """Yield rows as NDJSON lines, fetching them from the database in chunks"""
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        for item in result.scalars():
+            yield dumps(serialize(item)) + b"\n"
+    finally:
+        db.close()
+
+@app.get("/debug/feedback", response_class=FastJSONResponse)
+def get_feedback(
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Get one page of feedback from user_progress; pass next_cursor as after_id for the next page"""
+    feedback_items, next_cursor = paginate(
+        db.query(models.UserProgress).filter(models.UserProgress.type == "feedback"),
+        models.UserProgress.id, after_id, limit
+    )
+    return FastJSONResponse({
+        "count": len(feedback_items),
+        "items": [feedback_item(item) for item in feedback_items],
+        "next_cursor": next_cursor
+    })
+
+@app.get("/debug/feedback/stream")
+def stream_feedback():
+    """Stream all feedback from user_progress as NDJSON"""
+    statement = (
+        select(models.UserProgress)
+        .where(models.UserProgress.type == "feedback")
+        .order_by(models.UserProgress.id)
+    )
+    return StreamingResponse(stream_ndjson(statement, feedback_item), media_type="application/x-ndjson")
+
+@app.get("/debug/question-pool")
+async def get_question_pool_metrics():
+    """Get question pool depth, hit rate and refill latency"""
+    return question_pool.metrics()
+
+@app.get("/debug/response-cache")
+async def get_response_cache_metrics():
+    """Get response cache size and hit rate"""
+    return await asyncio.to_thread(response_cache.metrics)
+
+@app.get("/debug/progress-writer")
+async def get_progress_writer_metrics():
+    """Get write-behind buffer depth and flush counts"""
+    return progress_writer.metrics()
+
+@app.get("/debug/knowledge", response_class=FastJSONResponse)
+def get_knowledge(
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Get one page of entries from knowledge_items; pass next_cursor as after_id for the next page"""
+    knowledge_items, next_cursor = paginate(
+        db.query(models.KnowledgeItem), models.KnowledgeItem.id, after_id, limit
+    )
+    return FastJSONResponse({
+        "count": len(knowledge_items),
+        "items": [knowledge_item(item) for item in knowledge_items],
+        "next_cursor": next_cursor
+    })
+
+@app.get("/debug/knowledge/stream")
+def stream_knowledge():
+    """Stream all entries from knowledge_items as NDJSON"""
+    statement = select(models.KnowledgeItem).order_by(models.KnowledgeItem.id)
+    return StreamingResponse(stream_ndjson(statement, knowledge_item), media_type="application/x-ndjson")
+
+# Topic responses only change when the topics file is reloaded, so each one
+# is serialized once per topics file version and then served as cached bytes.
+# The same version backs their ETags, so revalidation never touches the index.
+topic_responses = RenderedCache()
+
+def topic_response(request: Request, key, build) -> Response:
+    """Serve a topic endpoint from its cached body, building it on first use"""
+    version = resources.topic_manager.content_version
+    etag = make_etag("topics", version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    body = topic_responses.get(key, version, build)
+    if body is None:
         raise HTTPException(status_code=404, detail="Topic not found")
-    return topic
+    return RenderedJSONResponse(body, headers=cache_headers(etag))
 
-@app.get("/topics/search/{topic_name}")
-async def search_topics(topic_name: str):
-    """Search for topics by name"""
-    topics = topic_manager.get_topics_by_name(topic_name)
-    return {"topics": topics}
+def topic_field_response(request: Request, topic_id: int, field: str, getter) -> Response:
+    """Serve a single field of a topic, or 404 when the topic has none"""
+    def build():
+        value = getter(topic_id)
+        return {field: value} if value else None
+    return topic_response(request, (field, topic_id), build)
 
-@app.get("/topics/{topic_id}/benefits")
-async def get_topic_benefits(topic_id: int):
+@app.get("/topics", response_class=RenderedJSONResponse)
+async def get_all_topics(request: Request):
+    """Get all unique topics"""
+    return topic_response(request, "names", lambda: {"topics": resources.topic_manager.get_unique_topics()})
+
+@app.get("/topics/{topic_id}", response_class=RenderedJSONResponse)
+async def get_topic(topic_id: int, request: Request):
+    """Get detailed information about a specific topic.
+
+    Duplicate records resolve to their canonical one; the requested id is kept
+    in the response, with the number of records sharing its content.
+    """
+    def build():
+        topic = resources.topic_manager.get_topic_by_id(topic_id)
+        return {**topic.to_dict(), "id": topic_id, "variant_count": topic.variant_count} if topic else None
+    return topic_response(request, ("topic", topic_id), build)
+
+@app.get("/topics/search/{topic_name}", response_class=RenderedJSONResponse)
+async def search_topics(topic_name: str, request: Request):
+    """Search for topics by name; duplicate records are collapsed into one with a variant count"""
+    def build():
+        topics = resources.topic_manager.get_topics_by_name(topic_name)
+        return {"topics": [{**topic.to_dict(), "variant_count": topic.variant_count} for topic in topics]}
+    return topic_response(request, ("search", topic_name.lower()), build)
+
+@app.get("/topics/{topic_id}/benefits", response_class=RenderedJSONResponse)
+async def get_topic_benefits(topic_id: int, request: Request):
     """Get benefits for a specific topic"""
-    benefits = topic_manager.get_topic_benefits(topic_id)
-    if not benefits:
-        raise HTTPException(status_code=404, detail="Topic not found")
-    return {"benefits": benefits}
+    return topic_field_response(request, topic_id, "benefits", resources.topic_manager.get_topic_benefits)
 
-@app.get("/topics/{topic_id}/challenges")
-async def get_topic_challenges(topic_id: int):
+@app.get("/topics/{topic_id}/challenges", response_class=RenderedJSONResponse)
+async def get_topic_challenges(topic_id: int, request: Request):
     """Get challenges for a specific topic"""
-    challenges = topic_manager.get_topic_challenges(topic_id)
-    if not challenges:
-        raise HTTPException(status_code=404, detail="Topic not found")
-    return {"challenges": challenges}
+    return topic_field_response(request, topic_id, "challenges", resources.topic_manager.get_topic_challenges)
 
-@app.get("/topics/{topic_id}/definition")
-async def get_topic_definition(topic_id: int):
+@app.get("/topics/{topic_id}/definition", response_class=RenderedJSONResponse)
+async def get_topic_definition(topic_id: int, request: Request):
     """Get definition for a specific topic"""
-    definition = topic_manager.get_topic_definition(topic_id)
-    if not definition:
-        raise HTTPException(status_code=404, detail="Topic not found")
-    return {"definition": definition}
+    return topic_field_response(request, topic_id, "definition", resources.topic_manager.get_topic_definition)
 
-@app.get("/topics/{topic_id}/use-case")
-async def get_topic_use_case(topic_id: int):
+@app.get("/topics/{topic_id}/use-case", response_class=RenderedJSONResponse)
+async def get_topic_use_case(topic_id: int, request: Request):
     """Get use case for a specific topic"""
-    use_case = topic_manager.get_topic_use_case(topic_id)
-    if not use_case:
-        raise HTTPException(status_code=404, detail="Topic not found")
-    return {"use_case": use_case}
+    return topic_field_response(request, topic_id, "use_case", resources.topic_manager.get_topic_use_case)
 
-@app.get("/topics/{topic_id}/relation")
-async def get_topic_relation(topic_id: int):
+@app.get("/topics/{topic_id}/relation", response_class=RenderedJSONResponse)
+async def get_topic_relation(topic_id: int, request: Request):
     """Get relation to LLMs for a specific topic"""
-    relation = topic_manager.get_topic_relation(topic_id)
-    if not relation:
-        raise HTTPException(status_code=404, detail="Topic not found")
-    return {"relation_to_LLMs": relation} 
\ No newline at end of file
+    return topic_field_response(request, topic_id, "relation_to_LLMs", resources.topic_manager.get_topic_relation)
@@ -0,0 +1,191 @@
+import json
+from sqlalchemy import bindparam, inspect, select
+from .models import KnowledgeItem, UserProgress
+
+# Schema version recorded in SQLite's user_version pragma
+SCHEMA_VERSION = 4
+# Rows re-read from JSON per transaction while backfilling promoted columns
+BACKFILL_BATCH_SIZE = 5000
+
+def migrate(engine):
+    """Bring an existing database up to SCHEMA_VERSION; safe to run on every start"""
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+    if version >= SCHEMA_VERSION:
+        return
+
+    if version < 1:
+        _migrate_user_progress_columns(engine)
+    if version < 2:
+        _migrate_knowledge_content_hash(engine)
+    if version < 3:
+        _migrate_knowledge_doc_id(engine)
+    if version < 4:
+        _migrate_user_progress_type_id_index(engine)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    print(f"Database migrated to schema version {SCHEMA_VERSION}")
+
+def _migrate_user_progress_columns(engine):
+    """Add the promoted user_progress columns and indexes, then backfill them from content"""
+    table = UserProgress.__table__
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    promoted = [table.c.difficulty, table.c.correct_answer, table.c.helpful, table.c.rating]
+
+    with engine.begin() as conn:
+        for column in promoted:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+    update = (
+        table.update()
+        .where(table.c.id == bindparam("row_id"))
+        .values(
+            correct_answer=bindparam("new_correct_answer"),
+            helpful=bindparam("new_helpful"),
+            rating=bindparam("new_rating"),
+        )
+    )
+    last_id = 0
+    backfilled = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.type, table.c.content)
+                .where(table.c.id > last_id, table.c.type.in_(("question", "feedback")))
+                .order_by(table.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                try:
+                    data = json.loads(row.content or "{}")
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                fields = UserProgress.promoted_fields(row.type, data)
+                if any(value is not None for value in fields.values()):
+                    params.append({
+                        "row_id": row.id,
+                        "new_correct_answer": fields.get("correct_answer"),
+                        "new_helpful": fields.get("helpful"),
+                        "new_rating": fields.get("rating"),
+                    })
+            if params:
+                conn.execute(update, params)
+                backfilled += len(params)
+            last_id = rows[-1].id
+    print(f"Backfilled promoted fields for {backfilled} user progress rows")
+
+def _migrate_knowledge_content_hash(engine):
+    """Add knowledge_items.content_hash and backfill it.
+
+    Rows that duplicate an earlier (category_id, content) pair are removed.
+    The unique (category_id, content_hash) index this version added was
+    replaced by the doc_id index in version 3.
+    """
+    table = KnowledgeItem.__table__
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        if "content_hash" not in existing:
+            column_type = table.c.content_hash.type.compile(dialect=engine.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN content_hash {column_type}")
+
+    update = (
+        table.update()
+        .where(table.c.id == bindparam("row_id"))
+        .values(content_hash=bindparam("new_content_hash"))
+    )
+    last_id = 0
+    seen = set()
+    duplicate_ids = []
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.category_id, table.c.content)
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                content_hash = KnowledgeItem.hash_content(row.content)
+                key = (row.category_id, content_hash)
+                if key in seen:
+                    duplicate_ids.append(row.id)
+                    continue
+                seen.add(key)
+                params.append({"row_id": row.id, "new_content_hash": content_hash})
+            if params:
+                conn.execute(update, params)
+            last_id = rows[-1].id
+
+    with engine.begin() as conn:
+        for start in range(0, len(duplicate_ids), BACKFILL_BATCH_SIZE):
+            conn.execute(table.delete().where(table.c.id.in_(duplicate_ids[start:start + BACKFILL_BATCH_SIZE])))
+    print(f"Backfilled content hashes for {len(seen)} knowledge items, removed {len(duplicate_ids)} duplicates")
+
+def _migrate_knowledge_doc_id(engine):
+    """Add knowledge_items.doc_id, backfill it and key seeding on it instead of content.
+
+    Rows seeded before items were keyed by doc_id can share one, when an
+    item's content was revised and the new content inserted next to the
+    old; only the newest row for each doc_id is kept.
+    """
+    table = KnowledgeItem.__table__
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        if "doc_id" not in existing:
+            column_type = table.c.doc_id.type.compile(dialect=engine.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN doc_id {column_type}")
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ux_knowledge_items_category_content_hash")
+
+    update = (
+        table.update()
+        .where(table.c.id == bindparam("row_id"))
+        .values(doc_id=bindparam("new_doc_id"))
+    )
+    last_id = 0
+    newest = {}
+    duplicate_ids = []
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.category_id, table.c.type, table.c.source)
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                doc_id = KnowledgeItem.make_doc_id(row.category_id, row.type, row.source)
+                if doc_id in newest:
+                    duplicate_ids.append(newest[doc_id])
+                newest[doc_id] = row.id
+                params.append({"row_id": row.id, "new_doc_id": doc_id})
+            conn.execute(update, params)
+            last_id = rows[-1].id
+
+    with engine.begin() as conn:
+        for start in range(0, len(duplicate_ids), BACKFILL_BATCH_SIZE):
+            conn.execute(table.delete().where(table.c.id.in_(duplicate_ids[start:start + BACKFILL_BATCH_SIZE])))
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    print(f"Backfilled doc ids for {len(newest)} knowledge items, removed {len(duplicate_ids)} superseded rows")
+
+def _migrate_user_progress_type_id_index(engine):
+    """Add the (type, id) index that serves feedback pages and streams in id order"""
+    index = next(index for index in UserProgress.__table__.indexes if index.name == "ix_user_progress_type_id")
+    with engine.begin() as conn:
+        index.create(conn, checkfirst=True)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import hashlib
 from .database import Base
 
 class Category(Base):
@@ -13,9 +14,14 @@ class Category(Base):
 
 class KnowledgeItem(Base):
     __tablename__ = "knowledge_items"
+    __table_args__ = (
+        Index("ux_knowledge_items_doc_id", "doc_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
+    doc_id = Column(String)  # {category_id}_{type}_{source}, also the ChromaDB document id
     content = Column(Text, nullable=False)
+    content_hash = Column(String(64))  # sha256 of content, compared to detect changed items
     type = Column(String)  # definition, architecture, challenges, etc.
     source = Column(String)  # research_paper, technical_doc, etc.
     difficulty = Column(String)  # beginner, intermediate, advanced
@@ -25,12 +31,47 @@ class KnowledgeItem(Base):
     
     category = relationship("Category", back_populates="knowledge_items")
 
+    @staticmethod
+    def make_doc_id(category_id: str, type: str, source: str) -> str:
+        """Stable id of a knowledge item, shared by its SQL row and its ChromaDB document"""
+        return f"{category_id}_{type}_{source}"
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """Hash item content so changes are detected without reading it back"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        Index("ix_user_progress_type_timestamp", "type", "timestamp"),
+        Index("ix_user_progress_type_id", "type", "id"),  # keyset pages and streams of one type
+        Index("ix_user_progress_category_type_timestamp", "category_id", "type", "timestamp"),
+        Index("ix_user_progress_question_id", "question_id"),
+    )
     
     id = Column(Integer, primary_key=True)
     question_id = Column(String)
     category_id = Column(String, ForeignKey("categories.id"))
     timestamp = Column(DateTime, default=datetime.utcnow)
     type = Column(String)  # question, feedback
-    content = Column(Text)  # JSON string of question or feedback data 
\ No newline at end of file
+    content = Column(Text)  # JSON string of question or feedback data
+    # Fields promoted out of content so they can be filtered and aggregated
+    difficulty = Column(String)  # question difficulty
+    correct_answer = Column(String)  # question answer letter
+    helpful = Column(Boolean)  # feedback thumbs up / down
+    rating = Column(Integer)  # feedback rating, when one is given
+
+    @staticmethod
+    def promoted_fields(type: str, data: dict) -> dict:
+        """Extract the promoted column values from a question or feedback payload"""
+        if type == "question":
+            return {"correct_answer": data.get("correct_answer")}
+        if type == "feedback":
+            helpful = data.get("helpful")
+            rating = data.get("rating")
+            return {
+                "helpful": helpful if isinstance(helpful, bool) else None,
+                "rating": rating if isinstance(rating, int) and not isinstance(rating, bool) else None,
+            }
+        return {}
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from .data_definitions import CATEGORIES, KNOWLEDGE_BASE
+from .models import KnowledgeItem
+
+# Directory holding the artifacts and watermarks the pipeline stages share
+PIPELINE_DIR = Path(os.getenv("PIPELINE_DIR", "data/pipeline"))
+
+# Snapshots written by update_database and read by the downstream stages
+KNOWLEDGE_ARTIFACT = "knowledge.json"
+TOPICS_ARTIFACT = "topics.json"
+
+def artifact_path(name: str) -> Path:
+    return PIPELINE_DIR / name
+
+def read_json(name: str, default: Any = None) -> Any:
+    """Read a pipeline artifact, or return default if it doesn't exist yet"""
+    try:
+        with open(artifact_path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+def write_json(name: str, data: Any):
+    """Write a pipeline artifact atomically, so readers never see a partial file"""
+    path = artifact_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def read_watermark(stage: str) -> Dict[str, Any]:
+    """The content hashes a stage recorded at the end of its last successful run"""
+    return read_json(f"{stage}.watermark.json", {})
+
+def write_watermark(stage: str, watermark: Dict[str, Any]):
+    write_json(f"{stage}.watermark.json", watermark)
+
+def diff_hashes(current: Dict[str, str], previous: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """Keys that are new or changed in current, and keys that were removed"""
+    changed = [key for key, value in current.items() if previous.get(key) != value]
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+def item_hash(item: Dict) -> str:
+    payload = json.dumps(item, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def knowledge_snapshot() -> Dict[str, Dict]:
+    """Every knowledge item from KNOWLEDGE_BASE, keyed by its doc_id (its ChromaDB document id).
+
+    Each item carries its category name and a hash of its fields.
+    """
+    category_names = {cat["id"]: cat["name"] for cat in CATEGORIES}
+    snapshot = {}
+    for category_id, items in KNOWLEDGE_BASE.items():
+        category_name = category_names.get(category_id)
+        if not category_name:
+            continue
+        for item in items:
+            entry = {
+                "category_id": category_id,
+                "category_name": category_name,
+                "content": item["content"],
+                "type": item["type"],
+                "source": item["source"],
+                "difficulty": item["difficulty"],
+            }
+            entry["hash"] = item_hash(entry)
+            snapshot[KnowledgeItem.make_doc_id(category_id, item["type"], item["source"])] = entry
+    return snapshot
@@ -0,0 +1,142 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from . import models
+from .database import SessionLocal
+
+# Flush once this many rows are buffered...
+PROGRESS_BATCH_SIZE = int(os.getenv("PROGRESS_BATCH_SIZE", "200"))
+# ...or once the oldest buffered row has waited this long, in seconds
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "0.5"))
+# Rows held in memory before add() starts dropping them
+PROGRESS_MAX_PENDING = 100_000
+
+_STOP = object()
+
+class ProgressWriter:
+    """Write-behind buffer for UserProgress rows.
+
+    Request handlers hand rows to add(), which only enqueues them. A
+    background thread writes them in batched transactions when the batch
+    size or flush interval is reached, so requests don't wait on an fsync.
+    Rows handed over together with add_many() are always written in the
+    same transaction. stop() drains everything still buffered.
+    """
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = PROGRESS_BATCH_SIZE,
+                 flush_interval: float = PROGRESS_FLUSH_INTERVAL,
+                 max_pending: int = PROGRESS_MAX_PENDING):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Flush every buffered row and stop the writer thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def add(self, **values):
+        """Buffer a UserProgress row without blocking"""
+        values.setdefault("timestamp", datetime.utcnow())
+        if self._thread is None:
+            self._write([values])
+            return
+        try:
+            self._queue.put_nowait(values)
+        except queue.Full:
+            self.dropped += 1
+            print("Progress buffer full, dropping row")
+
+    def add_many(self, rows: List[Dict]):
+        """Buffer several UserProgress rows that must be written in one transaction"""
+        if not rows:
+            return
+        now = datetime.utcnow()
+        for values in rows:
+            values.setdefault("timestamp", now)
+        if self._thread is None:
+            self._write(rows)
+            return
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            self.dropped += len(rows)
+            print(f"Progress buffer full, dropping {len(rows)} rows")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Dict] = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                # A group from add_many() joins the batch whole, never split
+                if isinstance(item, list):
+                    batch.extend(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if stopping:
+                # Drain whatever arrived alongside the stop request
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, list):
+                        batch.extend(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+            if batch:
+                self._write(batch)
+
+    def _write(self, rows: List[Dict]):
+        db = self.session_factory()
+        try:
+            db.bulk_insert_mappings(models.UserProgress, rows)
+            db.commit()
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            db.rollback()
+            self.failed += len(rows)
+            print(f"Error writing {len(rows)} user progress rows: {e}")
+        finally:
+            db.close()
+
+    def metrics(self) -> Dict:
+        return {
+            "pending": self._queue.qsize(),  # rows and add_many() groups
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
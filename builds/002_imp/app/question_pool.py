@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+PoolKey = Tuple[str, str]  # (category_id, difficulty)
+
+# Questions kept ready per (category, difficulty); 0 disables the pool
+QUESTION_POOL_DEPTH = int(os.getenv("QUESTION_POOL_DEPTH", "0"))
+# Maximum number of background generations running at once
+QUESTION_POOL_REFILL_CONCURRENCY = int(os.getenv("QUESTION_POOL_REFILL_CONCURRENCY", "2"))
+# Pause after a failed refill before trying the same key again, in seconds
+REFILL_RETRY_DELAY = 10.0
+
+class PoolStats:
+    """Counters for one pool key"""
+
+    __slots__ = ("hits", "misses", "refills", "failures", "refill_seconds", "last_refill_seconds")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.failures = 0
+        self.refill_seconds = 0.0
+        self.last_refill_seconds = 0.0
+
+class QuestionPool:
+    """Pre-generated questions per (category, difficulty), refilled in the background.
+
+    Requests pop a ready question without waiting on the model. One refill
+    task per key keeps its queue at the target depth, sleeping until a pop
+    drains it; a shared semaphore bounds how many generations run at once.
+    """
+
+    def __init__(self, generate: Callable[[str, str], Awaitable[Dict]],
+                 target_depth: int = QUESTION_POOL_DEPTH,
+                 refill_concurrency: int = QUESTION_POOL_REFILL_CONCURRENCY):
+        self.generate = generate
+        self.target_depth = target_depth
+        self._semaphore = asyncio.Semaphore(max(1, refill_concurrency))
+        self._queues: Dict[PoolKey, Deque[Dict]] = {}
+        self._wakeups: Dict[PoolKey, asyncio.Event] = {}
+        self._stats: Dict[PoolKey, PoolStats] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_depth > 0
+
+    def start(self, keys: Iterable[PoolKey]):
+        """Start a refill task for each key"""
+        if not self.enabled:
+            return
+        for key in keys:
+            if key in self._queues:
+                continue
+            self._queues[key] = deque()
+            self._wakeups[key] = asyncio.Event()
+            self._stats[key] = PoolStats()
+            self._tasks.append(asyncio.create_task(self._refill(key)))
+        print(f"Question pool started for {len(self._queues)} keys at depth {self.target_depth}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def pop(self, key: PoolKey) -> Optional[Dict]:
+        """Take a ready question for the key, or None if the pool is empty"""
+        queue = self._queues.get(key)
+        if queue is None:
+            return None
+        stats = self._stats[key]
+        if not queue:
+            stats.misses += 1
+            self._wakeups[key].set()
+            return None
+        stats.hits += 1
+        question = queue.popleft()
+        self._wakeups[key].set()
+        return question
+
+    async def _refill(self, key: PoolKey):
+        queue = self._queues[key]
+        wakeup = self._wakeups[key]
+        stats = self._stats[key]
+        category_id, difficulty = key
+        while True:
+            if len(queue) >= self.target_depth:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    question = await self.generate(category_id, difficulty)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    stats.failures += 1
+                    print(f"Question pool refill failed for {key}: {e}")
+                    question = None
+                elapsed = time.perf_counter() - started
+            if question is None:
+                await asyncio.sleep(REFILL_RETRY_DELAY)
+                continue
+            queue.append(question)
+            stats.refills += 1
+            stats.refill_seconds += elapsed
+            stats.last_refill_seconds = elapsed
+
+    def metrics(self) -> Dict:
+        """Pool depth, hit rate and refill latency, overall and per key"""
+        keys = {}
+        total_hits = total_misses = 0
+        for key, stats in self._stats.items():
+            lookups = stats.hits + stats.misses
+            total_hits += stats.hits
+            total_misses += stats.misses
+            keys[f"{key[0]}:{key[1]}"] = {
+                "depth": len(self._queues[key]),
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "hit_rate": stats.hits / lookups if lookups else None,
+                "refills": stats.refills,
+                "refill_failures": stats.failures,
+                "avg_refill_seconds": stats.refill_seconds / stats.refills if stats.refills else None,
+                "last_refill_seconds": stats.last_refill_seconds if stats.refills else None,
+            }
+        lookups = total_hits + total_misses
+        return {
+            "enabled": self.enabled,
+            "target_depth": self.target_depth,
+            "hit_rate": total_hits / lookups if lookups else None,
+            "keys": keys,
+        }
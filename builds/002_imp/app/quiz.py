@@ -0,0 +1,200 @@
+import json
+import random
+import sys
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Sequence, Tuple
+from .topic_utils import Topic, topic_fragments
+
+VALID_DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+REQUIRED_FIELDS = ["question", "options", "correct_answer", "explanation"]
+# Most questions requested from one Gemini call by the batch endpoint
+MAX_BATCH_SIZE = 10
+
+# Every way to pick 2 or 3 of a topic's 5 aspects. There are as many pairs as
+# triples, so one uniform choice matches picking the size, then the aspects.
+ASPECT_CHOICES = tuple(combinations(range(5), 2)) + tuple(combinations(range(5), 3))
+
+def build_context(topics: Sequence[Topic]) -> str:
+    """Build prompt context from a random sample of topics and aspects"""
+    # Randomly select up to 5 topics for context
+    selected_topics = random.sample(topics, min(5, len(topics)))
+
+    # Randomly select 2-3 rendered aspects for each topic
+    context = []
+    for topic in selected_topics:
+        fragments = topic_fragments(topic)
+        for index in random.choice(ASPECT_CHOICES):
+            context.append(fragments[index])
+
+    # Shuffle the context to avoid predictable patterns
+    random.shuffle(context)
+    context = "\n".join(context)
+    print(f"Generated context from topics {[topic.id for topic in selected_topics]}, length: {len(context)}")
+    return context
+
+# Gemini prompt for a single quiz question. Everything except the context is
+# fixed per (category, difficulty), so those sections are rendered once and
+# cached; building a prompt is then one concatenation.
+PROMPT_TEMPLATE = """You are a quiz generator for teaching about {category_name}. 
+    Using this context: {context}
+    
+    Generate a {difficulty}-level multiple choice question that tests understanding of {category_name}.
+    
+    IMPORTANT: Make this question DIFFERENT from typical questions by:
+    1. Using varied question types:
+       - "What is..." (definition/explanation)
+       - "Why is..." (reasoning/analysis)
+       - "How does..." (process/mechanism)
+       - "Which of the following..." (comparison/selection)
+       - "In what scenario..." (application)
+       - "What would happen if..." (hypothetical)
+       - "Which statement best describes..." (analysis)
+       - "What are the key differences between..." (comparison)
+       - "How would you implement..." (practical application)
+       - "What are the potential risks of..." (critical thinking)
+    
+    2. Varying cognitive levels:
+       - Beginner: Focus on definitions, basic concepts, and simple relationships
+       - Intermediate: Focus on applications, comparisons, and practical scenarios
+       - Advanced: Focus on analysis, troubleshooting, and edge cases
+    
+    3. Using different question structures:
+       - Direct questions
+       - Scenario-based questions
+       - Problem-solving questions
+       - Comparison questions
+       - "What if" questions
+       - Case study questions
+       - Implementation questions
+       - Debugging questions
+    
+    4. Varying topics within {category_name}:
+       - Core concepts
+       - Implementation details
+       - Best practices
+       - Common challenges
+       - Real-world applications
+       - Edge cases
+       - Performance considerations
+       - Security implications
+    
+    5. Making options more interesting:
+       - Include partially correct answers
+       - Use realistic but incorrect alternatives
+       - Add common misconceptions as options
+       - Include "all of the above" or "none of the above" when appropriate
+    
+    Guidelines for {difficulty} level:
+    - Use clear, precise language
+    - Make options distinct and unambiguous
+    - Include a helpful explanation
+    - For beginner: focus on fundamental concepts
+    - For intermediate: focus on practical applications
+    - For advanced: focus on complex scenarios and edge cases
+    
+    Format your response as a valid JSON object with these exact fields:
+    - question: the question text
+    - options: array of 4 options prefixed with A), B), C), D)
+    - correct_answer: just the letter (A, B, C, or D)
+    - explanation: brief, easy-to-understand explanation of the correct answer
+    
+    Keep the response concise and ensure it's valid JSON."""
+_PROMPT_HEAD, _PROMPT_TAIL = PROMPT_TEMPLATE.split("{context}")
+
+# The batch prompt keeps every instruction of the single-question prompt and
+# only replaces its output format with an array of questions
+_BATCH_FORMAT = """Generate {count} multiple choice questions following the instructions above.
+    Each question must cover a different aspect of {category_name} and use a different question type.
+    
+    Format your response as a valid JSON array of {count} objects, each with these exact fields:
+    - question: the question text
+    - options: array of 4 options prefixed with A), B), C), D)
+    - correct_answer: just the letter (A, B, C, or D)
+    - explanation: brief, easy-to-understand explanation of the correct answer
+    
+    Keep the response concise and ensure it's valid JSON."""
+_BATCH_TAIL = _PROMPT_TAIL[:_PROMPT_TAIL.index("Format your response")] + _BATCH_FORMAT
+
+@lru_cache(maxsize=256)
+def _prompt_sections(category_name: str, difficulty: str) -> Tuple[str, str]:
+    head = _PROMPT_HEAD.format(category_name=category_name, difficulty=difficulty)
+    tail = _PROMPT_TAIL.format(category_name=category_name, difficulty=difficulty)
+    return sys.intern(head), sys.intern(tail)
+
+def build_prompt(category_name: str, difficulty: str, context: str) -> str:
+    """Build the Gemini prompt for a single quiz question"""
+    head, tail = _prompt_sections(category_name, difficulty)
+    return head + context + tail
+
+@lru_cache(maxsize=256)
+def _batch_prompt_sections(category_name: str, difficulty: str, count: int) -> Tuple[str, str]:
+    head, _ = _prompt_sections(category_name, difficulty)
+    tail = _BATCH_TAIL.format(category_name=category_name, difficulty=difficulty, count=count)
+    return head, sys.intern(tail)
+
+def build_batch_prompt(category_name: str, difficulty: str, context: str, count: int) -> str:
+    """Build the Gemini prompt for several quiz questions in one call"""
+    head, tail = _batch_prompt_sections(category_name, difficulty, count)
+    return head + context + tail
+
+def _load_response(response_text: str):
+    """Strip a Markdown code fence from a model response and parse it as JSON"""
+    # Clean the response text to ensure valid JSON
+    cleaned_text = response_text.strip()
+    if cleaned_text.startswith("```json"):
+        cleaned_text = cleaned_text[7:]
+    if cleaned_text.endswith("```"):
+        cleaned_text = cleaned_text[:-3]
+    cleaned_text = cleaned_text.strip()
+
+    print("Cleaned response:", cleaned_text)
+    return json.loads(cleaned_text)
+
+def parse_question(response_text: str) -> Dict:
+    """Clean a model response and validate it as a quiz question.
+
+    Raises json.JSONDecodeError for invalid JSON and ValueError for
+    missing fields or a wrong number of options.
+    """
+    return validate_question(_load_response(response_text))
+
+def parse_questions(response_text: str) -> Tuple[List[Dict], int]:
+    """Clean a batch model response and validate each question in it.
+
+    Returns the valid questions and the number of invalid ones dropped.
+    Raises json.JSONDecodeError for invalid JSON and ValueError when the
+    response is not an array of questions.
+    """
+    data = _load_response(response_text)
+    if isinstance(data, dict) and isinstance(data.get("questions"), list):
+        data = data["questions"]
+    if not isinstance(data, list):
+        raise ValueError("Response must be a JSON array of questions")
+
+    questions = []
+    for question_data in data:
+        try:
+            questions.append(validate_question(question_data))
+        except (ValueError, TypeError) as e:
+            print(f"Dropping invalid question: {e}")
+    return questions, len(data) - len(questions)
+
+def validate_question(question_data) -> Dict:
+    """Check a parsed question has every required field and exactly 4 options"""
+    if not isinstance(question_data, dict):
+        raise ValueError("Question must be a JSON object")
+
+    # Validate the response format
+    if not all(field in question_data for field in REQUIRED_FIELDS):
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in question_data]
+        print(f"Missing required fields: {missing_fields}")
+        raise ValueError(f"Response missing required fields: {missing_fields}")
+    options = question_data["options"]
+    if not isinstance(options, list):
+        print(f"Invalid options: expected a list, got {type(options).__name__}")
+        raise ValueError("Response must have exactly 4 options")
+    if len(options) != 4:
+        print(f"Invalid number of options: {len(options)}")
+        raise ValueError("Response must have exactly 4 options")
+    return question_data
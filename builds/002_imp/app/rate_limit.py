@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, NamedTuple
+from fastapi import HTTPException, Request
+from .local_sqlite import LocalSQLite
+
+# Where rate limit state lives: memory (per worker) or sqlite (shared by workers on a host)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", "data/rate_limits.db")
+# Comma-separated API keys that get their own budget via the X-API-Key header.
+# The app doesn't authenticate keys otherwise, so any other key is ignored
+# and the client is limited by IP address.
+RATE_LIMIT_API_KEYS = frozenset(
+    key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()
+)
+# Per-worker cap on tracked clients per route before idle entries are pruned
+MAX_TRACKED_CLIENTS = 100_000
+# Seconds between each worker's sweeps of expired rows from the sqlite store
+PRUNE_INTERVAL = 60
+
+class RateLimit(NamedTuple):
+    requests: int  # Requests allowed per period, also the burst size
+    period: float  # Period in seconds
+
+# Request budgets per route, per client
+RATE_LIMITS = {
+    "quiz": RateLimit(10, 60),
+    "feedback": RateLimit(60, 60),
+}
+
+class MemoryRateLimitStore:
+    """Theoretical arrival times per client, kept in this worker's memory"""
+
+    def __init__(self):
+        self._tats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, route: str, client: str, emission: float, period: float, now: float) -> float:
+        with self._lock:
+            tats = self._tats.get(route)
+            if tats is None:
+                tats = self._tats[route] = {}
+            tat = tats.get(client, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + emission
+            if new_tat - now > period:
+                return new_tat - now - period
+            if len(tats) >= MAX_TRACKED_CLIENTS and client not in tats:
+                self._prune(tats, now)
+            tats[client] = new_tat
+            return 0.0
+
+    @staticmethod
+    def _prune(tats: Dict[str, float], now: float):
+        for client in [client for client, tat in tats.items() if tat <= now]:
+            del tats[client]
+
+class SQLiteRateLimitStore:
+    """Theoretical arrival times in a LocalSQLite file.
+
+    Rows whose arrival time has passed carry no state, so they are deleted
+    every PRUNE_INTERVAL seconds to keep the table from growing with every
+    client ever seen.
+    """
+
+    def __init__(self, path: str):
+        self._db = LocalSQLite(path, timeout=5, isolation_level=None)
+        self._next_prune = 0.0
+        with self._db.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    route TEXT NOT NULL,
+                    client TEXT NOT NULL,
+                    tat REAL NOT NULL,
+                    PRIMARY KEY (route, client)
+                ) WITHOUT ROWID
+            """)
+
+    def update(self, route: str, client: str, emission: float, period: float, now: float) -> float:
+        conn = self._db.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tat FROM rate_limits WHERE route = ? AND client = ?", (route, client)
+            ).fetchone()
+            tat = max(row[0], now) if row else now
+            new_tat = tat + emission
+            if new_tat - now > period:
+                conn.execute("COMMIT")
+                return new_tat - now - period
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (route, client, tat) VALUES (?, ?, ?)",
+                (route, client, new_tat)
+            )
+            if now >= self._next_prune:
+                conn.execute("DELETE FROM rate_limits WHERE tat < ?", (now,))
+                self._next_prune = now + PRUNE_INTERVAL
+            conn.execute("COMMIT")
+            return 0.0
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+class RateLimiter:
+    """GCRA rate limiter keyed by route and client.
+
+    Each client only needs one stored timestamp per route (its theoretical
+    arrival time), so a check is a single lookup and comparison. A client
+    may burst up to the route's full budget, then is held to the average
+    rate.
+    """
+
+    def __init__(self, limits: Dict[str, RateLimit], store):
+        self.limits = limits
+        self.store = store
+        self._emissions = {route: limit.period / limit.requests for route, limit in limits.items()}
+
+    def check(self, route: str, client: str) -> float:
+        """Record a request; returns 0 if allowed, else seconds until it would be"""
+        return self.store.update(
+            route, client, self._emissions[route], self.limits[route].period, time.time()
+        )
+
+    def limit(self, route: str) -> Callable:
+        """FastAPI dependency that enforces the route's budget per client"""
+        def dependency(request: Request):
+            retry_after = self.check(route, client_identity(request))
+            if retry_after:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Rate limit exceeded. Please wait a moment before trying again.",
+                    headers={"Retry-After": str(int(retry_after) + 1)}
+                )
+        return dependency
+
+def client_identity(request: Request) -> str:
+    """Identify a client by a trusted API key (RATE_LIMIT_API_KEYS), otherwise by IP address"""
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in RATE_LIMIT_API_KEYS:
+        return f"key:{api_key}"
+    return request.client.host if request.client else "unknown"
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the rate limiter configured by the RATE_LIMIT_* settings"""
+    if RATE_LIMIT_BACKEND == "memory":
+        store = MemoryRateLimitStore()
+    elif RATE_LIMIT_BACKEND == "sqlite":
+        store = SQLiteRateLimitStore(RATE_LIMIT_PATH)
+    else:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND}")
+    return RateLimiter(RATE_LIMITS, store)
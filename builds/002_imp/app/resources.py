@@ -0,0 +1,90 @@
+import asyncio
+import os
+from typing import Dict, Optional
+from . import models
+from .category_cache import CategoryCache
+from .database import engine
+from .init_chroma import get_collection, init_chroma
+from .migrations import migrate
+from .topic_utils import TopicManager
+
+class AppResources:
+    """Process-wide resources, created once by the FastAPI lifespan.
+
+    Topics, categories and the SQL schema are set up before the app starts serving.
+    ChromaDB can be warmed in a background task, so endpoints that don't
+    need the vector store (categories, topics) serve immediately while it
+    loads. Readiness is reported per component.
+    """
+
+    def __init__(self):
+        self.topic_manager: Optional[TopicManager] = None
+        self.categories = CategoryCache()
+        self.chroma_client = None
+        self.knowledge_base = None
+        self.user_progress = None
+        self.chroma_error: Optional[str] = None
+        self._chroma_ready = asyncio.Event()
+        self._chroma_task: Optional[asyncio.Task] = None
+
+    async def startup(self):
+        # Create database tables and migrate existing ones
+        await asyncio.to_thread(models.Base.metadata.create_all, bind=engine)
+        await asyncio.to_thread(migrate, engine)
+        await asyncio.to_thread(self.categories.load)
+
+        # Initialize TopicManager and reload it when the topics file changes
+        # In lazy mode the sidecar build and file digest run here, not in the first request
+        self.topic_manager = await asyncio.to_thread(TopicManager)
+        await asyncio.to_thread(self.topic_manager.load)
+        self.topic_manager.start_watching(float(os.getenv("TOPICS_RELOAD_INTERVAL", "5")))
+
+        if os.getenv("CHROMA_BACKGROUND_INIT", "true").lower() in ("1", "true", "yes"):
+            self._chroma_task = asyncio.create_task(self._init_chroma())
+        else:
+            await self._init_chroma()
+            if self.chroma_error:
+                raise RuntimeError(f"Error initializing ChromaDB: {self.chroma_error}")
+
+    async def _init_chroma(self):
+        try:
+            client = await asyncio.to_thread(init_chroma)
+            self.knowledge_base = get_collection(client, "knowledge_base")
+            self.user_progress = get_collection(client, "user_progress", searchable=False)
+            self.chroma_client = client
+            self._chroma_ready.set()
+            print("ChromaDB initialized successfully")
+        except Exception as e:
+            self.chroma_error = str(e)
+            print(f"Error initializing ChromaDB: {str(e)}")
+
+    async def wait_for_chroma(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the vector store is warm; returns False on timeout or failure"""
+        try:
+            await asyncio.wait_for(self._chroma_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.chroma_client is not None
+
+    async def shutdown(self):
+        if self._chroma_task is not None and not self._chroma_task.done():
+            self._chroma_task.cancel()
+        if self.topic_manager is not None:
+            await asyncio.to_thread(self.topic_manager.stop_watching)
+
+    def readiness(self) -> Dict[str, str]:
+        """Status of each component needed to serve every endpoint"""
+        if self._chroma_ready.is_set():
+            chroma_status = "ready"
+        elif self.chroma_error:
+            chroma_status = "failed"
+        else:
+            chroma_status = "starting"
+        return {
+            "topics": "ready" if self.topic_manager is not None else "starting",
+            "chroma": chroma_status,
+        }
+
+    @property
+    def ready(self) -> bool:
+        return all(status == "ready" for status in self.readiness().values())
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from .local_sqlite import LocalSQLite
+
+# Which store to use for cached Gemini responses: none, memory or sqlite
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "none").lower()
+# Maximum number of cached responses before least recently used ones are evicted
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+# Seconds a cached response stays valid
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+# Chance that a request is answered from cache when an entry exists; the rest
+# regenerate and refresh the entry so questions stay varied
+RESPONSE_CACHE_PROBABILITY = float(os.getenv("RESPONSE_CACHE_PROBABILITY", "0.5"))
+# SQLite file shared by all workers on the host when using the sqlite backend
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "data/response_cache.db")
+
+class MemoryCacheBackend:
+    """Per-process LRU cache with a TTL"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SQLiteCacheBackend:
+    """LRU cache with a TTL in a LocalSQLite file"""
+
+    # Calls query and commit with a busy timeout, so they must not run on the event loop
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._db = LocalSQLite(path, timeout=5)
+        with self._db.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at ON response_cache (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._db.connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            if row[1] < now:
+                conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key: str, value: str):
+        conn = self._db.connect()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now)
+            )
+            conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                "SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def __len__(self) -> int:
+        return self._db.connect().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+class ResponseCache:
+    """Cache of validated Gemini questions keyed on a normalized prompt fingerprint"""
+
+    def __init__(self, backend=None, serve_probability: float = RESPONSE_CACHE_PROBABILITY):
+        self.backend = backend
+        self.serve_probability = serve_probability
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def fingerprint(category_name: str, difficulty: str, context: str) -> str:
+        """Key a prompt by its variable parts, ignoring context order and duplicates.
+
+        The static prompt template is the same for every request, so only the
+        category, difficulty and the set of context lines identify a prompt.
+        """
+        lines = sorted({" ".join(line.split()) for line in context.splitlines() if line.strip()})
+        payload = "\n".join([category_name.lower(), difficulty, *lines])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _call(self, method, *args):
+        """Run a backend method, in a worker thread when the backend blocks on I/O"""
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Return a cached question, or None on a miss or a random bypass"""
+        if not self.enabled:
+            return None
+        if random.random() >= self.serve_probability:
+            self.bypassed += 1
+            return None
+        value = await self._call(self.backend.get, key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    async def set(self, key: str, question_data: Dict):
+        if self.enabled:
+            await self._call(self.backend.set, key, json.dumps(question_data))
+
+    def metrics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.enabled else None,
+            "entries": len(self.backend) if self.enabled else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+def create_response_cache() -> ResponseCache:
+    """Build the response cache configured by the RESPONSE_CACHE_* settings"""
+    if RESPONSE_CACHE_BACKEND == "memory":
+        backend = MemoryCacheBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+    elif RESPONSE_CACHE_BACKEND == "sqlite":
+        backend = SQLiteCacheBackend(RESPONSE_CACHE_PATH, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+    elif RESPONSE_CACHE_BACKEND in ("", "none"):
+        backend = None
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {RESPONSE_CACHE_BACKEND}")
+    return ResponseCache(backend)
@@ -0,0 +1,42 @@
+import os
+from typing import Dict, List, Sequence
+from .quiz import VALID_DIFFICULTIES
+
+# Where quiz context comes from: topics (random topic aspects), retrieval
+# (knowledge_base search) or hybrid (both)
+CONTEXT_SOURCE = os.getenv("CONTEXT_SOURCE", "hybrid").lower()
+# Number of knowledge base fragments retrieved per question
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+
+def difficulty_filter(category_name: str, difficulty: str) -> Dict:
+    """Metadata filter for a category's fragments at or below a difficulty"""
+    levels = VALID_DIFFICULTIES[:VALID_DIFFICULTIES.index(difficulty) + 1]
+    return {"$and": [
+        {"category": category_name},
+        {"difficulty": {"$in": levels}},
+    ]}
+
+def retrieve_fragments(collection, category_name: str, difficulty: str,
+                       query_texts: Sequence[str], k: int = RETRIEVAL_TOP_K) -> List[List[str]]:
+    """Top-k knowledge base fragments for each query text, in one search call.
+
+    The batch quiz endpoint passes one query per question, so a batch for
+    one category and difficulty costs a single embedding pass and a single
+    vector search. Identical query texts (the category name, when context
+    comes from retrieval alone) are embedded and searched once.
+    """
+    unique_texts = list(dict.fromkeys(query_texts))
+    if not unique_texts:
+        return []
+    results = collection.query(
+        query_texts=unique_texts,
+        n_results=k,
+        where=difficulty_filter(category_name, difficulty),
+        include=["documents"],
+    )
+    by_text = dict(zip(unique_texts, results["documents"]))
+    return [list(by_text[text]) for text in query_texts]
+
+def retrieval_query(category_name: str, context: str = "") -> str:
+    """The text searched for when retrieving fragments for a question"""
+    return f"{category_name}\n{context}" if context else category_name
@@ -1,61 +1,531 @@
+import hashlib
 import json
+import mmap
+import os
+import re
+import sys
+import tempfile
+import threading
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+from . import pipeline
+
+# Source file for topics, and the deduplicated JSONL sidecar built from it
+TOPICS_PATH = Path("data/llm_related_topics.json")
+TOPICS_SIDECAR_PATH = TOPICS_PATH.with_suffix(".jsonl")
+# Seconds a lazy index replaced by a reload stays open for readers still using it
+TOPICS_RETIRE_GRACE = float(os.getenv("TOPICS_RETIRE_GRACE", "30"))
+
+_SKIP_WS = re.compile(r"\s*")
+_SKIP_SEPARATORS = re.compile(r"[\s,]*")
+_WHITESPACE = re.compile(r"\s+")
+# Record fields compared when detecting duplicates; the id is ignored
+_CONTENT_FIELDS = ("topic", "definition", "use_case", "benefits", "challenges", "relation_to_LLMs")
+
+@dataclass(frozen=True, slots=True)
+class Topic:
+    """A single immutable topic record from the topics file"""
+    id: int
+    topic: str
+    definition: str
+    use_case: str
+    benefits: Tuple[str, ...]
+    challenges: Tuple[str, ...]
+    relation_to_LLMs: str
+    # Ids of every record in the topics file with this content, this one first
+    variant_ids: Tuple[int, ...] = field(default=(), repr=False, compare=False)
+
+    def __post_init__(self):
+        if not self.variant_ids:
+            object.__setattr__(self, "variant_ids", (self.id,))
+
+    @property
+    def variant_count(self) -> int:
+        return len(self.variant_ids)
+
+    @classmethod
+    def from_dict(cls, data: Dict, variant_ids: Tuple[int, ...] = ()) -> "Topic":
+        """Build a topic from a raw JSON record, interning the name and the
+        short list items, which repeat across topics"""
+        return cls(
+            id=int(data["id"]),
+            topic=sys.intern(data["topic"]),
+            definition=data["definition"],
+            use_case=data["use_case"],
+            benefits=tuple(sys.intern(item) for item in data["benefits"]),
+            challenges=tuple(sys.intern(item) for item in data["challenges"]),
+            relation_to_LLMs=data["relation_to_LLMs"],
+            variant_ids=variant_ids,
+        )
+
+    def to_dict(self) -> Dict:
+        """Convert the topic back to its JSON shape"""
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "definition": self.definition,
+            "use_case": self.use_case,
+            "benefits": list(self.benefits),
+            "challenges": list(self.challenges),
+            "relation_to_LLMs": self.relation_to_LLMs,
+        }
+
+@lru_cache(maxsize=256)
+def topic_fragments(topic: Topic) -> Tuple[str, ...]:
+    """Prompt context lines for each of a topic's five aspects, rendered on first use"""
+    return (
+        f"Definition: {topic.definition}",
+        f"Use Case: {topic.use_case}",
+        f"Benefits: {', '.join(topic.benefits)}",
+        f"Challenges: {', '.join(topic.challenges)}",
+        f"Relation to LLMs: {topic.relation_to_LLMs}",
+    )
+
+def _normalize(value):
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip().rstrip(".").casefold()
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+def topic_content_hash(data: Dict) -> str:
+    """Hash a topic record's content, ignoring its id, case, whitespace and
+    trailing periods, so re-worded copies that differ only in formatting match"""
+    payload = json.dumps({key: _normalize(data.get(key)) for key in _CONTENT_FIELDS}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def dedupe_topics(items: Iterable[Dict]) -> List[Tuple[Dict, Tuple[int, ...]]]:
+    """Collapse duplicate topic records into canonical ones.
+
+    Returns each distinct record (the first one seen) with the ids of all
+    records that share its content hash, in file order.
+    """
+    canonical: Dict[str, Tuple[Dict, List[int]]] = {}
+    for item in items:
+        record, ids = canonical.setdefault(topic_content_hash(item), (item, []))
+        ids.append(int(item["id"]))
+    return [(record, tuple(ids)) for record, ids in canonical.values()]
+
+def topic_variant_ids(items: Iterable[Dict]) -> Dict[str, List[int]]:
+    """Ids of the records sharing each content hash, in file order, without keeping the records"""
+    variants: Dict[str, List[int]] = {}
+    for item in items:
+        variants.setdefault(topic_content_hash(item), []).append(int(item["id"]))
+    return variants
+
+def iter_deduped_topics(source_path: Path) -> Iterator[Tuple[Dict, Tuple[int, ...]]]:
+    """Stream the distinct records of a topics file with the ids of their duplicates.
+
+    The file is read twice: once to collect the ids for each content hash,
+    and once to yield the first record seen for each hash. Only the ids are
+    held in memory, never the records.
+    """
+    variants = topic_variant_ids(iter_json_array(source_path))
+    for item in iter_json_array(source_path):
+        ids = variants.pop(topic_content_hash(item), None)
+        if ids is not None:
+            yield item, tuple(ids)
+
+class TopicIndex:
+    """Read-only hash indexes over a list of topics, built once at load time"""
+
+    __slots__ = ("topics", "by_id", "by_name", "unique_names")
+
+    def __init__(self, topics: List[Topic]):
+        by_id: Dict[int, Topic] = {}
+        grouped: Dict[str, List[Topic]] = {}
+        names: Dict[str, None] = {}
+        for topic in topics:
+            for topic_id in topic.variant_ids:
+                by_id[topic_id] = topic
+            grouped.setdefault(topic.topic.lower(), []).append(topic)
+            names[topic.topic] = None
+
+        self.topics: Tuple[Topic, ...] = tuple(topics)
+        self.by_id = by_id
+        self.by_name: Dict[str, Tuple[Topic, ...]] = {
+            name: tuple(items) for name, items in grouped.items()
+        }
+        self.unique_names: Tuple[str, ...] = tuple(names)
+
+    def get(self, topic_id: int) -> Optional[Topic]:
+        return self.by_id.get(topic_id)
+
+    def named(self, name: str) -> Sequence[Topic]:
+        return self.by_name.get(name.lower(), ())
+
+    def all(self) -> Sequence[Topic]:
+        return self.topics
+
+class LazyTopicSequence(Sequence):
+    """A sequence of topic ids that only decodes the records actually read"""
+
+    __slots__ = ("_ids", "_decode")
+
+    def __init__(self, ids: "array[int]", decode: Callable[[int], Topic]):
+        self._ids = ids
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._decode(topic_id) for topic_id in self._ids[position]]
+        return self._decode(self._ids[position])
+
+class LazyTopicIndex:
+    """Offset index over a JSONL sidecar of the topics file.
+
+    Each sidecar line is ``<ids>\t<json topic name>\t<json record>``, where
+    ``<ids>`` lists the canonical id followed by the ids of its duplicates,
+    comma separated. The index can be rebuilt from the sidecar by splitting
+    on tabs, without decoding any records. Records are decoded from a memory map on demand,
+    with the hottest ones kept in a small LRU cache.
+    """
+
+    def __init__(self, sidecar_path: Path, cache_size: int = 1024):
+        self.sidecar_path = sidecar_path
+        self._offsets: Dict[int, int] = {}
+        self._variant_ids: Dict[int, Tuple[int, ...]] = {}
+        self._canonical_ids: Dict[int, int] = {}
+        canonical_ids = array("q")
+        grouped: Dict[str, array] = {}
+        names: Dict[str, None] = {}
+
+        self._file = open(sidecar_path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mmap = None
+
+        offset = 0
+        for line in self._file:
+            raw_ids, raw_name, _ = line.split(b"\t", 2)
+            variant_ids = tuple(int(topic_id) for topic_id in raw_ids.split(b","))
+            topic_id = variant_ids[0]
+            name = sys.intern(json.loads(raw_name))
+            self._offsets[topic_id] = offset
+            for variant_id in variant_ids:
+                self._canonical_ids[variant_id] = topic_id
+            self._variant_ids[topic_id] = variant_ids
+            canonical_ids.append(topic_id)
+            grouped.setdefault(name.lower(), array("q")).append(topic_id)
+            names[name] = None
+            offset += len(line)
+
+        self._ids = canonical_ids
+        self._by_name = grouped
+        self.unique_names: Tuple[str, ...] = tuple(names)
+        self._decode = lru_cache(maxsize=cache_size)(self._read_record)
+
+    def _read_record(self, topic_id: int) -> Topic:
+        offset = self._offsets[topic_id]
+        end = self._mmap.find(b"\n", offset)
+        line = self._mmap[offset:end if end != -1 else len(self._mmap)]
+        return Topic.from_dict(json.loads(line.split(b"\t", 2)[2]), self._variant_ids[topic_id])
+
+    def get(self, topic_id: int) -> Optional[Topic]:
+        # Duplicate ids resolve to their canonical record, decoded and cached once
+        canonical_id = self._canonical_ids.get(topic_id)
+        if canonical_id is None:
+            return None
+        return self._decode(canonical_id)
+
+    def named(self, name: str) -> Sequence[Topic]:
+        ids = self._by_name.get(name.lower())
+        return LazyTopicSequence(ids, self._decode) if ids else ()
+
+    def all(self) -> Sequence[Topic]:
+        return LazyTopicSequence(self._ids, self._decode)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 20) -> Iterator[Dict]:
+    """Stream the items of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size)
+        position = _SKIP_WS.match(buffer).end()
+        if buffer[position:position + 1] != "[":
+            raise json.JSONDecodeError("Expected a JSON array", buffer, position)
+        position += 1
+        while True:
+            position = _SKIP_SEPARATORS.match(buffer, position).end()
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                if position >= len(buffer):
+                    raise json.JSONDecodeError("Need more data", buffer, position)
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield item
+
+def write_topic_sidecar(topics: Iterable[Tuple[Dict, Sequence[int]]], sidecar_path: Path) -> int:
+    """Write canonical topic records with their variant ids as the JSONL sidecar used by lazy mode"""
+    count = 0
+    # A temp file per writer, since every worker and the pipeline may build the sidecar at once
+    fd, tmp_path = tempfile.mkstemp(prefix=sidecar_path.name + ".", suffix=".tmp", dir=sidecar_path.parent)
+    try:
+        with open(fd, "w", encoding="utf-8", newline="\n") as out:
+            for item, variant_ids in topics:
+                ids = ",".join(str(topic_id) for topic_id in variant_ids)
+                out.write(f"{ids}\t{json.dumps(item['topic'])}\t{json.dumps(item)}\n")
+                count += 1
+        os.replace(tmp_path, sidecar_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+def build_topic_sidecar(source_path: Path, sidecar_path: Path) -> int:
+    """Convert the topics JSON array into the deduplicated JSONL sidecar used by lazy mode"""
+    return write_topic_sidecar(iter_deduped_topics(source_path), sidecar_path)
+
+def file_digest(path: Path) -> str:
+    """Digest of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+def topic_snapshot(source_path: Path = TOPICS_PATH) -> Dict:
+    """Deduplicated topics from the topics file, keyed by content hash, with the file's digest"""
+    topics = {}
+    for item, variant_ids in dedupe_topics(iter_json_array(source_path)):
+        topics[topic_content_hash(item)] = {"record": item, "variant_ids": list(variant_ids)}
+    return {"digest": file_digest(source_path), "topics": topics}
+
+def process_topics(snapshot: Optional[Dict] = None) -> Dict[str, int]:
+    """Pipeline stage: refresh the topics sidecar from the snapshot written by update_database.
+
+    Each canonical topic's content hash and variant ids are compared with
+    this stage's watermark; the sidecar is only rewritten when one changed.
+    Without an upstream snapshot the topics file is read directly.
+    """
+    if snapshot is None:
+        snapshot = pipeline.read_json(pipeline.TOPICS_ARTIFACT) or topic_snapshot()
+    topics = snapshot["topics"]
+    current = {
+        content_hash: ",".join(str(topic_id) for topic_id in entry["variant_ids"])
+        for content_hash, entry in topics.items()
+    }
+    changed, removed = pipeline.diff_hashes(current, pipeline.read_watermark("process_topics"))
+
+    if changed or removed or not TOPICS_SIDECAR_PATH.exists():
+        count = write_topic_sidecar(
+            ((entry["record"], entry["variant_ids"]) for entry in topics.values()), TOPICS_SIDECAR_PATH
+        )
+        print(f"Wrote topic sidecar with {count} records at {TOPICS_SIDECAR_PATH}")
+    else:
+        # Mark the sidecar current so lazy loading doesn't rebuild it from a touched source file
+        TOPICS_SIDECAR_PATH.touch()
+    pipeline.write_watermark("process_topics", current)
+    print(f"Processed topics: {len(changed)} changed, {len(removed)} removed, {len(topics)} total")
+    return {"changed": len(changed), "removed": len(removed), "topics": len(topics)}
 
 class TopicManager:
-    def __init__(self):
-        self.data_path = Path("data/llm_related_topics.json")
-        self.topics = self._load_topics()
+    def __init__(self, lazy: Optional[bool] = None):
+        self.data_path = TOPICS_PATH
+        self.sidecar_path = TOPICS_SIDECAR_PATH
+        if lazy is None:
+            lazy = os.getenv("TOPICS_LAZY_LOAD", "false").lower() in ("1", "true", "yes")
+        self.lazy = lazy
+        self.version = 0
+        # Digest of the topics file the active index was built from; identical
+        # files give the same value in every worker, so it can back HTTP ETags
+        self.content_version = ""
+        self._signature = None
+        self._index_lock = threading.Lock()
+        self._stop_watching = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._index = None if lazy else self._load_index()
+
+    def load(self):
+        """Build the index now if it hasn't been built yet; in lazy mode it is otherwise built on first use"""
+        return self.index
+
+    @property
+    def index(self):
+        """The active topic index; in lazy mode it is built on first use"""
+        index = self._index
+        if index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = self._load_index()
+                index = self._index
+        return index
+
+    @property
+    def topics(self) -> Sequence[Topic]:
+        return self.index.all()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.data_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_topics(self) -> List[Topic]:
+        """Load topics from JSON file, collapsing duplicate records"""
+        with open(self.data_path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        topics = [Topic.from_dict(item, variant_ids) for item, variant_ids in dedupe_topics(items)]
+        print(f"Loaded {len(topics)} distinct topics from {len(items)} records")
+        return topics
+
+    def _build_index(self):
+        """Build a fresh index from the topics file, raising on any error.
+
+        Returns the index with the file signature and content digest it was built from.
+        """
+        signature = self._file_signature()
+        digest = file_digest(self.data_path)
+        if not self.lazy:
+            return TopicIndex(self._load_topics()), signature, digest
 
-    def _load_topics(self) -> List[Dict]:
-        """Load topics from JSON file"""
+        source_mtime = self.data_path.stat().st_mtime
+        if (not self.sidecar_path.exists()
+                or self.sidecar_path.stat().st_mtime < source_mtime):
+            count = build_topic_sidecar(self.data_path, self.sidecar_path)
+            print(f"Built topic sidecar with {count} records at {self.sidecar_path}")
+        return LazyTopicIndex(self.sidecar_path), signature, digest
+
+    def _load_index(self):
+        """Build the initial index, falling back to an empty one on errors"""
         try:
-            with open(self.data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            index, self._signature, self.content_version = self._build_index()
+            return index
         except FileNotFoundError:
+            if self.data_path.exists():
+                # The sidecar, not the topics file, is missing; don't serve an empty index for that
+                raise
             print(f"Warning: Topics file not found at {self.data_path}")
-            return []
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, KeyError, ValueError):
             print(f"Warning: Invalid JSON in topics file at {self.data_path}")
-            return []
+        # Leave the signature unset so the watcher retries the load on its next poll
+        self._signature = None
+        return TopicIndex([])
+
+    def reload(self) -> bool:
+        """Rebuild the indexes if the topics file changed and swap them in.
+
+        The new index is built off to the side and published with a single
+        reference assignment, so concurrent readers see either the old or the
+        new index, never a partial one. If the build fails (for example while
+        the file is still being written) the old index stays active and the
+        next call tries again.
+        """
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            index, signature, digest = self._build_index()
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError) as e:
+            print(f"Warning: Keeping previous topics, reload of {self.data_path} failed: {e}")
+            return False
 
-    def get_topic_by_id(self, topic_id: int) -> Optional[Dict]:
+        with self._index_lock:
+            previous = self._index
+            self._index = index
+            self._signature = signature
+            self.content_version = digest
+            self.version += 1
+        print(f"Reloaded topics from {self.data_path} (version {self.version})")
+        if previous is not None:
+            self._retire(previous)
+        return True
+
+    def _retire(self, index):
+        """Close a replaced lazy index once readers that fetched it before the swap are done.
+
+        Requests may still hold the old index, or lazy sequences over it, so
+        its file handle and memory map are released after TOPICS_RETIRE_GRACE
+        seconds rather than at the swap.
+        """
+        close = getattr(index, "close", None)
+        if close is None:
+            return
+        timer = threading.Timer(TOPICS_RETIRE_GRACE, close)
+        timer.daemon = True
+        timer.start()
+
+    def start_watching(self, interval: float = 5.0):
+        """Poll the topics file in a background thread and reload it on change"""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Error reloading topics: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="topic-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background file watcher"""
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def get_topic_by_id(self, topic_id: int) -> Optional[Topic]:
         """Get a topic by its ID"""
-        return next((topic for topic in self.topics if topic["id"] == topic_id), None)
+        return self.index.get(topic_id)
 
-    def get_topics_by_name(self, topic_name: str) -> List[Dict]:
+    def get_topics_by_name(self, topic_name: str) -> Sequence[Topic]:
         """Get all topics with a specific name"""
-        return [topic for topic in self.topics if topic["topic"].lower() == topic_name.lower()]
+        return self.index.named(topic_name)
 
-    def get_all_topics(self) -> List[Dict]:
+    def get_all_topics(self) -> Sequence[Topic]:
         """Get all topics"""
-        return self.topics
+        return self.index.all()
 
     def get_unique_topics(self) -> List[str]:
         """Get list of unique topic names"""
-        return list(set(topic["topic"] for topic in self.topics))
+        return list(self.index.unique_names)
 
     def get_topic_benefits(self, topic_id: int) -> List[str]:
         """Get benefits for a specific topic"""
         topic = self.get_topic_by_id(topic_id)
-        return topic["benefits"] if topic else []
+        return list(topic.benefits) if topic else []
 
     def get_topic_challenges(self, topic_id: int) -> List[str]:
         """Get challenges for a specific topic"""
         topic = self.get_topic_by_id(topic_id)
-        return topic["challenges"] if topic else []
+        return list(topic.challenges) if topic else []
 
     def get_topic_definition(self, topic_id: int) -> Optional[str]:
         """Get definition for a specific topic"""
         topic = self.get_topic_by_id(topic_id)
-        return topic["definition"] if topic else None
+        return topic.definition if topic else None
 
     def get_topic_use_case(self, topic_id: int) -> Optional[str]:
         """Get use case for a specific topic"""
         topic = self.get_topic_by_id(topic_id)
-        return topic["use_case"] if topic else None
+        return topic.use_case if topic else None
 
     def get_topic_relation(self, topic_id: int) -> Optional[str]:
         """Get relation to LLMs for a specific topic"""
         topic = self.get_topic_by_id(topic_id)
-        return topic["relation_to_LLMs"] if topic else None 
\ No newline at end of file
+        return topic.relation_to_LLMs if topic else None
@@ -1,5 +1,15 @@
+import argparse
+import json
 import sqlite3
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, Optional
+
+# Suffix of the file next to each database where the inspector keeps the
+# previous report, to compute growth between runs
+SNAPSHOT_SUFFIX = ".inspect.json"
+# Rows sampled per index when refreshing sqlite_stat1 with --analyze
+ANALYSIS_LIMIT = 1000
 
 def view_database():
     # Get the database path
@@ -40,5 +50,177 @@ def view_database():
     
     conn.close()
 
+def _btree_sizes(conn: sqlite3.Connection) -> Optional[Dict[str, Dict]]:
+    """Page-level size and entry count of every table and index from the dbstat virtual table.
+
+    Pages are walked but rows are never decoded: entries are the cell
+    counts of the leaf pages, which for a table is its row count. Returns
+    None when SQLite was built without dbstat.
+    """
+    try:
+        rows = conn.execute(
+            "SELECT name, COUNT(*), SUM(pgsize), SUM(payload), SUM(unused), "
+            "SUM(CASE WHEN pagetype = 'leaf' THEN ncell ELSE 0 END) FROM dbstat GROUP BY name"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    return {
+        name: {"pages": pages, "bytes": size, "payload_bytes": payload, "unused_bytes": unused, "entries": entries}
+        for name, pages, size, payload, unused, entries in rows
+    }
+
+def snapshot_path_for(db_path: Path) -> Path:
+    """The inspector snapshot kept next to a database, e.g. data/curiousbot.db.inspect.json"""
+    return db_path.with_name(db_path.name + SNAPSHOT_SUFFIX)
+
+def inspect_database(db_path: Path = Path("data/curiousbot.db"), analyze: bool = False,
+                     with_sizes: bool = False, track_growth: bool = True) -> Dict:
+    """Report row counts, indexes and free space from database statistics.
+
+    By default only the schema, the file header pragmas and sqlite_stat1
+    are read, so the cost doesn't grow with the data; row counts are the
+    estimates ANALYZE recorded, and unknown when it never ran. With analyze,
+    sqlite_stat1 is first refreshed by a sampled ANALYZE. With with_sizes, every
+    page of every table and index is walked through dbstat for exact row
+    counts, byte sizes and unused space, which costs about as much as
+    reading the whole file. With track_growth, growth is
+    reported against the previous run's report, kept next to the database,
+    and this report replaces it.
+    """
+    if analyze:
+        conn = sqlite3.connect(db_path)
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        conn.execute("ANALYZE")
+        conn.commit()
+    else:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        stats: Dict[str, Dict[str, str]] = {}
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            for table_name, index_name, stat in conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1"):
+                stats.setdefault(table_name, {})[index_name] = stat
+        sizes = _btree_sizes(conn) if with_sizes else None
+
+        tables = {}
+        table_names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        for table_name in table_names:
+            table_stats = stats.get(table_name, {})
+            table_size = sizes.get(table_name) if sizes else None
+            # sqlite_stat1 rows start with the number of entries in the table or index
+            stat_counts = [int(stat.split()[0]) for stat in table_stats.values() if stat]
+            if sizes is not None:
+                rows, row_source = (table_size["entries"] if table_size else 0), "dbstat"
+            elif stat_counts:
+                rows, row_source = max(stat_counts), "sqlite_stat1"
+            else:
+                rows, row_source = None, None
+
+            indexes = []
+            for _, index_name, unique, origin, _ in conn.execute(f"PRAGMA index_list('{table_name}')"):
+                columns = [row[2] for row in conn.execute(f"PRAGMA index_info('{index_name}')")]
+                stat = table_stats.get(index_name)
+                indexes.append({
+                    "name": index_name,
+                    "columns": columns,
+                    "unique": bool(unique),
+                    "origin": origin,
+                    # Average rows per distinct value of each column prefix; lower is more selective
+                    "rows_per_key": [int(value) for value in stat.split()[1:] if value.isdigit()] if stat else None,
+                    "bytes": sizes.get(index_name, {}).get("bytes") if sizes else None,
+                })
+
+            index_bytes = sum(index["bytes"] or 0 for index in indexes)
+            tables[table_name] = {
+                "rows": rows,
+                "row_count_source": row_source,
+                "bytes": table_size["bytes"] if table_size else None,
+                "index_bytes": index_bytes if sizes else None,
+                "unused_ratio": (round(table_size["unused_bytes"] / table_size["bytes"], 3)
+                                 if table_size and table_size["bytes"] else None),
+                "indexes": indexes,
+            }
+    finally:
+        conn.close()
+
+    report = {
+        "database": str(db_path),
+        "inspected_at": datetime.now().isoformat(),
+        "page_size": page_size,
+        "page_count": page_count,
+        "file_bytes": page_size * page_count,
+        "freelist_pages": freelist_count,
+        "freelist_ratio": round(freelist_count / page_count, 3) if page_count else 0.0,
+        "tables": tables,
+    }
+
+    if track_growth:
+        snapshot_path = snapshot_path_for(db_path)
+        previous = None
+        if snapshot_path.exists():
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        if previous:
+            report["previous_inspected_at"] = previous.get("inspected_at")
+            for table_name, table in tables.items():
+                before = previous.get("tables", {}).get(table_name, {})
+                table["growth"] = {
+                    key: (table[key] - before[key]) if table[key] is not None and before.get(key) is not None else None
+                    for key in ("rows", "bytes", "index_bytes")
+                }
+        with open(snapshot_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+def print_report(report: Dict):
+    print(f"\n=== {report['database']} ===")
+    print(f"Size: {report['file_bytes'] / 1024:.0f} KiB in {report['page_count']} pages of {report['page_size']} bytes")
+    print(f"Free pages: {report['freelist_pages']} ({report['freelist_ratio']:.1%})")
+    if report.get("previous_inspected_at"):
+        print(f"Growth since: {report['previous_inspected_at']}")
+    for table_name, table in report["tables"].items():
+        print(f"\nTable: {table_name}")
+        print("-" * 50)
+        if table["rows"] is None:
+            print("Rows: unknown (run with --analyze or --sizes)")
+        else:
+            print(f"Rows: {table['rows']} (from {table['row_count_source']})")
+        if table["bytes"] is not None:
+            print(f"Size: {table['bytes'] / 1024:.0f} KiB data, {table['index_bytes'] / 1024:.0f} KiB indexes, "
+                  f"{table['unused_ratio']:.1%} unused")
+        growth = table.get("growth")
+        if growth:
+            print("Growth: " + ", ".join(f"{key} {value:+}" for key, value in growth.items() if value is not None))
+        for index in table["indexes"]:
+            details = f"({', '.join(index['columns'])})"
+            if index["unique"]:
+                details += " unique"
+            if index["rows_per_key"]:
+                details += f", rows per key {index['rows_per_key']}"
+            print(f"Index {index['name']}: {details}")
+
 if __name__ == "__main__":
-    view_database() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Inspect the application database")
+    parser.add_argument("--inspect", action="store_true",
+                        help="report estimated row counts and indexes from sqlite_stat1 without reading tables")
+    parser.add_argument("--analyze", action="store_true", help="refresh sqlite_stat1 with a sampled ANALYZE first")
+    parser.add_argument("--sizes", action="store_true",
+                        help="walk every page through dbstat for exact counts and sizes (reads the whole file)")
+    parser.add_argument("--json", action="store_true", help="print the inspector report as JSON")
+    parser.add_argument("--db", default="data/curiousbot.db")
+    args = parser.parse_args()
+
+    if args.inspect or args.analyze or args.sizes or args.json:
+        report = inspect_database(Path(args.db), analyze=args.analyze, with_sizes=args.sizes)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report)
+    else:
+        view_database()
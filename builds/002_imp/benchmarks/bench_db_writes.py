@@ -0,0 +1,134 @@
+"""Concurrent write benchmark for the SQLite storage profiles.
+
+Hammers the user_progress writes made by POST /quiz/{category_id} and
+POST /feedback/{question_id} from many threads against a scratch
+database, once per storage profile. Each profile is measured with one
+add + commit per request ("direct") and through the write-behind
+ProgressWriter the endpoints use ("write-behind").
+
+Run from the project root:
+    python benchmarks/bench_db_writes.py [--threads 16] [--requests 200]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app import models
+from app.database import Base, STORAGE_PROFILES, create_db_engine
+from app.progress_writer import ProgressWriter
+
+QUESTION = {
+    "question": "What does RAG stand for?",
+    "options": ["A) One", "B) Two", "C) Three", "D) Four"],
+    "correct_answer": "A",
+    "explanation": "Retrieval-Augmented Generation.",
+}
+
+def store_question(SessionLocal):
+    db = SessionLocal()
+    try:
+        db.add(models.UserProgress(
+            question_id=f"q-{datetime.now().timestamp()}",
+            category_id="rag",
+            type="question",
+            content=json.dumps(QUESTION)
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def submit_feedback(SessionLocal):
+    db = SessionLocal()
+    try:
+        db.add(models.UserProgress(
+            question_id="q-1",
+            type="feedback",
+            content=json.dumps({"helpful": True, "question_id": "q-1"})
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+def buffered_question(writer):
+    writer.add(
+        question_id=f"q-{datetime.now().timestamp()}",
+        category_id="rag",
+        type="question",
+        content=json.dumps(QUESTION)
+    )
+
+def buffered_feedback(writer):
+    writer.add(
+        question_id="q-1",
+        type="feedback",
+        content=json.dumps({"helpful": True, "question_id": "q-1"})
+    )
+
+def run(profile, mode, threads, requests_per_thread):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{tmp}/bench.db", profile)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        if mode == "write-behind":
+            target = ProgressWriter(SessionLocal)
+            target.start()
+            writes = (buffered_question, buffered_feedback)
+        else:
+            target = SessionLocal
+            writes = (store_question, submit_feedback)
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(index):
+            write = writes[index % 2]
+            local = []
+            for _ in range(requests_per_thread):
+                started = time.perf_counter()
+                try:
+                    write(target)
+                except OperationalError as e:
+                    with lock:
+                        errors.append(str(e.orig))
+                    continue
+                local.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(local)
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        if mode == "write-behind":
+            # Include the time to get every buffered row onto disk
+            target.stop()
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else float("nan")
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+    print(f"{profile:<8} {mode:<13} {len(latencies) / elapsed:>9.0f} writes/s  "
+          f"p50 {p50:>7.2f} ms  p99 {p99:>8.2f} ms  errors {len(errors)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="writes per thread")
+    args = parser.parse_args()
+    print(f"{args.threads} threads x {args.requests} writes")
+    for profile in STORAGE_PROFILES:
+        for mode in ("direct", "write-behind"):
+            run(profile, mode, args.threads, args.requests)
@@ -0,0 +1,142 @@
+"""Load test for the JSON encoding paths of the read endpoints.
+
+Serves the same payloads three ways from a scratch FastAPI app, run by
+uvicorn in a background thread, and hits them with concurrent requests
+over a local socket:
+
+- default: a dict returned from the endpoint, run through jsonable_encoder
+  and the standard library encoder by FastAPI
+- fast: FastJSONResponse returned directly (orjson when installed)
+- rendered: bytes serialized once by RenderedCache, as the topic endpoints do
+
+The payloads are a /topics/search response over the original, not
+deduplicated, topics file (about 100 records) and a full page of
+/debug/knowledge items.
+
+Run from the project root:
+    python benchmarks/bench_json_responses.py [--requests 2000] [--concurrency 32] [--port 8765]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.json_response import FastJSONResponse, RenderedCache, RenderedJSONResponse, orjson
+
+# Largest /debug/knowledge page (MAX_PAGE_SIZE in app.main)
+MAX_PAGE_SIZE = 1000
+
+def search_payload():
+    with open("data/llm_related_topics.json", "r", encoding="utf-8") as f:
+        records = json.load(f)
+    name = records[0]["topic"]
+    return {"topics": [record for record in records if record["topic"] == name]}
+
+def knowledge_payload():
+    now = datetime.now().isoformat()
+    return {
+        "count": MAX_PAGE_SIZE,
+        "items": [
+            {
+                "id": i,
+                "content": f"Knowledge item {i} about retrieval augmented generation",
+                "type": "concept",
+                "source": f"source_{i}",
+                "difficulty": "beginner",
+                "category_id": "rag",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, MAX_PAGE_SIZE + 1)
+        ],
+        "next_cursor": MAX_PAGE_SIZE,
+    }
+
+def build_app(payloads):
+    app = FastAPI()
+    rendered = RenderedCache()
+
+    for name, payload in payloads.items():
+        async def default(payload=payload):
+            return payload
+
+        async def fast(payload=payload):
+            return FastJSONResponse(payload)
+
+        async def cached(name=name, payload=payload):
+            return RenderedJSONResponse(rendered.get(name, 0, lambda: payload))
+
+        app.add_api_route(f"/{name}/default", default)
+        app.add_api_route(f"/{name}/fast", fast, response_class=FastJSONResponse)
+        app.add_api_route(f"/{name}/rendered", cached, response_class=RenderedJSONResponse)
+    return app
+
+async def load(client, path, requests, concurrency):
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "rps": requests / elapsed,
+    }
+
+def start_server(app, port):
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+async def main(args):
+    payloads = {"search": search_payload(), "knowledge": knowledge_payload()}
+    server, thread = start_server(build_app(payloads), args.port)
+    print(f"Encoder: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    print(f"{args.requests} requests per endpoint, {args.concurrency} concurrent")
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits,
+                                 timeout=None) as client:
+        for name, payload in payloads.items():
+            size = len(json.dumps(payload))
+            print(f"\n=== {name} ({size / 1024:.0f} KiB) ===")
+            for mode in ("default", "fast", "rendered"):
+                path = f"/{name}/{mode}"
+                await load(client, path, min(args.requests, 100), args.concurrency)
+                result = await load(client, path, args.requests, args.concurrency)
+                print(f"{mode:<9} p50 {result['p50']:>8.2f} ms  p99 {result['p99']:>8.2f} ms  "
+                      f"{result['rps']:>8.0f} req/s")
+
+    server.should_exit = True
+    thread.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""Prompt construction cost for generate_question, old vs pre-rendered.
+
+Builds quiz prompts for a category the way generate_question does, once
+with the previous per-request rendering (join every aspect, then format
+the whole template) and once with the pre-rendered topic fragments and
+cached prompt sections. Reports the cost per prompt and how much of one
+CPU core each approach needs to sustain 10k requests per second.
+
+Run from the project root:
+    python benchmarks/bench_prompt_build.py
+"""
+import contextlib
+import os
+import random
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.quiz import PROMPT_TEMPLATE, build_context, build_prompt
+from app.topic_utils import TopicManager
+
+TARGET_RATE = 10_000
+REQUESTS = 50_000
+
+def legacy_prompt(topics, category_name, difficulty):
+    """The previous generate_question context and prompt construction"""
+    selected_topics = random.sample(topics, min(5, len(topics)))
+    print(f"\nSelected {len(selected_topics)} topics for context:")
+    context = []
+    for topic in selected_topics:
+        print(f"\nUsing topic: {topic.topic} (ID: {topic.id})")
+        aspects = [
+            ("Definition", topic.definition),
+            ("Use Case", topic.use_case),
+            ("Benefits", ', '.join(topic.benefits)),
+            ("Challenges", ', '.join(topic.challenges)),
+            ("Relation to LLMs", topic.relation_to_LLMs)
+        ]
+        selected_aspects = random.sample(aspects, random.randint(2, 3))
+        for aspect_name, aspect_value in selected_aspects:
+            context.append(f"{aspect_name}: {aspect_value}")
+    random.shuffle(context)
+    context = "\n".join(context)
+    print("\nGenerated context length:", len(context))
+    return PROMPT_TEMPLATE.format(category_name=category_name, difficulty=difficulty, context=context)
+
+def current_prompt(topics, category_name, difficulty):
+    return build_prompt(category_name, difficulty, build_context(topics))
+
+def measure(build, topics, category_name):
+    difficulties = ["beginner", "intermediate", "advanced"]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for i in range(REQUESTS):
+            build(topics, category_name, difficulties[i % 3])
+        elapsed = time.perf_counter() - started
+    return elapsed / REQUESTS
+
+if __name__ == "__main__":
+    manager = TopicManager(lazy=False)
+    category_name = "RAG Systems"
+    topics = manager.get_topics_by_name(category_name)
+    print(f"{REQUESTS} prompts for '{category_name}' from {len(topics)} topics")
+    results = {}
+    for label, build in (("legacy", legacy_prompt), ("pre-rendered", current_prompt)):
+        per_prompt = measure(build, topics, category_name)
+        results[label] = per_prompt
+        print(f"{label:<13} {per_prompt * 1e6:>7.2f} us/prompt  "
+              f"{1 / per_prompt:>9.0f} prompts/s  "
+              f"{per_prompt * TARGET_RATE * 100:>6.1f}% of a core at {TARGET_RATE} req/s")
+    print(f"speedup {results['legacy'] / results['pre-rendered']:.1f}x")
@@ -0,0 +1,95 @@
+"""Seeding benchmark for init_db.
+
+Seeds a scratch SQLite database with synthetic knowledge items twice:
+once with the old per-row existence query (on a smaller corpus, since it
+scans the table for every item) and once with the set-based
+seed_knowledge_items(). The bulk path is then re-run on the seeded
+database to show the cost of a no-op re-seed.
+
+Run from the project root:
+    python benchmarks/bench_seed.py [--items 100000] [--per-row-items 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import Session
+
+from app.data_definitions import CATEGORIES
+from app.database import Base, create_db_engine
+from app.init_db import seed_categories, seed_knowledge_items
+from app.models import KnowledgeItem
+
+def synthetic_knowledge_base(size):
+    knowledge_base = {category["id"]: [] for category in CATEGORIES}
+    category_ids = list(knowledge_base)
+    for i in range(size):
+        knowledge_base[category_ids[i % len(category_ids)]].append({
+            "content": f"Synthetic knowledge item {i} describing a concept in some detail. " * 3,
+            "type": "concept",
+            "source": f"source_{i}",
+            "difficulty": "beginner",
+        })
+    return knowledge_base
+
+def seed_per_row(db, knowledge_base):
+    """The previous init_db loop: one existence query per item"""
+    for category_id, items in knowledge_base.items():
+        for item in items:
+            existing_item = db.query(KnowledgeItem).filter(
+                KnowledgeItem.content == item["content"],
+                KnowledgeItem.category_id == category_id
+            ).first()
+            if not existing_item:
+                db.add(KnowledgeItem(
+                    content=item["content"],
+                    type=item["type"],
+                    source=item["source"],
+                    difficulty=item["difficulty"],
+                    category_id=category_id
+                ))
+
+def timed(label, engine, seed):
+    db = Session(engine)
+    start = time.perf_counter()
+    seed(db)
+    db.commit()
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(f"{label:<32} {elapsed:>8.2f} s")
+
+def fresh_engine(directory, name):
+    engine = create_db_engine(f"sqlite:///{os.path.join(directory, name)}")
+    Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    seed_categories(db, CATEGORIES)
+    db.commit()
+    db.close()
+    return engine
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        small = synthetic_knowledge_base(args.per_row_items)
+        large = synthetic_knowledge_base(args.items)
+
+        print(f"\n=== {args.per_row_items} items ===")
+        engine = fresh_engine(directory, "per_row.db")
+        timed("per-row queries", engine, lambda db: seed_per_row(db, small))
+        engine = fresh_engine(directory, "bulk_small.db")
+        timed("bulk", engine, lambda db: seed_knowledge_items(db, small))
+
+        print(f"\n=== {args.items} items ===")
+        engine = fresh_engine(directory, "bulk_large.db")
+        timed("bulk", engine, lambda db: seed_knowledge_items(db, large))
+        timed("bulk re-seed (no new rows)", engine, lambda db: seed_knowledge_items(db, large))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--per-row-items", type=int, default=5_000)
+    main(parser.parse_args())
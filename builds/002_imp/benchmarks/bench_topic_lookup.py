@@ -0,0 +1,97 @@
+"""Compare the indexed TopicManager with the old scan-based topic lookups.
+
+Run from the project root:
+    python benchmarks/bench_topic_lookup.py
+"""
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.topic_utils import Topic, TopicIndex, TopicManager, dedupe_topics
+
+ITERATIONS = 2000
+
+class ScanTopicManager:
+    """The previous list-of-dicts implementation, kept here for comparison"""
+
+    def __init__(self, topics):
+        self.topics = topics
+
+    def get_topic_by_id(self, topic_id):
+        return next((topic for topic in self.topics if topic["id"] == topic_id), None)
+
+    def get_topics_by_name(self, topic_name):
+        return [topic for topic in self.topics if topic["topic"].lower() == topic_name.lower()]
+
+    def get_unique_topics(self):
+        return list(set(topic["topic"] for topic in self.topics))
+
+def scale_records(records, size):
+    """Repeat the corpus with fresh ids until it reaches the requested size"""
+    scaled = []
+    while len(scaled) < size:
+        for record in records:
+            if len(scaled) == size:
+                break
+            scaled.append(dict(record, id=len(scaled) + 1))
+    return scaled
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def run(size):
+    with open("data/llm_related_topics.json", "r", encoding="utf-8") as f:
+        records = scale_records(json.load(f), size)
+    payload = json.dumps(records)
+
+    scan, scan_bytes = measure_memory(lambda: ScanTopicManager(json.loads(payload)))
+    indexed = TopicManager.__new__(TopicManager)
+    index, index_bytes = measure_memory(
+        lambda: TopicIndex([Topic.from_dict(item) for item in json.loads(payload)])
+    )
+    indexed._index = index
+    deduped, deduped_bytes = measure_memory(
+        lambda: TopicIndex([Topic.from_dict(item, ids) for item, ids in dedupe_topics(json.loads(payload))])
+    )
+
+    ids = [random.randint(1, size) for _ in range(ITERATIONS)]
+    names = [random.choice(indexed.get_unique_topics()) for _ in range(ITERATIONS)]
+
+    print(f"\n=== {size} topics ===")
+    print(f"Memory: scan {scan_bytes / 1024:.0f} KiB, indexed {index_bytes / 1024:.0f} KiB, "
+          f"deduplicated {deduped_bytes / 1024:.0f} KiB ({len(deduped.topics)} distinct)")
+    search_name = names[0]
+    for label, source in (("indexed", index), ("deduplicated", deduped)):
+        seconds = timeit.timeit(
+            lambda: json.dumps([topic.to_dict() for topic in source.named(search_name)]), number=100
+        )
+        print(f"Search response for {search_name!r} ({label}): {seconds / 100 * 1e6:.0f} us")
+    for label, func, args in [
+        ("get_topic_by_id", "get_topic_by_id", ids),
+        ("get_topics_by_name", "get_topics_by_name", names),
+        ("get_unique_topics", "get_unique_topics", None),
+    ]:
+        timings = []
+        for manager in (scan, indexed):
+            method = getattr(manager, func)
+            if args is None:
+                seconds = timeit.timeit(method, number=ITERATIONS)
+            else:
+                seconds = timeit.timeit(lambda: [method(arg) for arg in args], number=1)
+            timings.append(seconds / ITERATIONS * 1e6)
+        print(f"{label:<20} scan {timings[0]:>10.2f} us  indexed {timings[1]:>8.2f} us  "
+              f"speedup {timings[0] / timings[1]:>8.1f}x")
+
+if __name__ == "__main__":
+    for size in (500, 10_000, 100_000):
+        run(size)